@@ -1,10 +1,12 @@
 import boto3
 import boto3.session
+import threading
 import typing
 
 import importlib
 
-from dataclasses import dataclass
+from botocore.config import Config
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -12,21 +14,66 @@ class AwsClient:
     region: typing.Optional[str] = None
     profile: typing.Optional[str] = None
     verbose: bool = False
+    max_pool_connections: typing.Optional[int] = None
+    retry_mode: typing.Optional[str] = None
+
+    _session: typing.Optional[boto3.session.Session] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _clients: typing.Dict[str, typing.Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _services: typing.Dict[str, typing.Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _lock: typing.Any = field(
+        default_factory=threading.RLock, init=False, repr=False, compare=False
+    )
+
+    def __getstate__(self):
+        # Sessions, clients and locks can't be pickled; workers build their own.
+        state = self.__dict__.copy()
+        state.update(_session=None, _clients={}, _services={}, _lock=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def config(self):
+        options = {}
+        if self.max_pool_connections:
+            options["max_pool_connections"] = self.max_pool_connections
+        if self.retry_mode:
+            options["retries"] = {"mode": self.retry_mode}
+        return Config(**options)
 
     @property
     def aws_session(self):
-        return boto3.session.Session(region_name=self.region, profile_name=self.profile)
+        # boto3 sessions aren't thread safe, create it once and share the clients.
+        with self._lock:
+            if self._session is None:
+                self._session = boto3.session.Session(
+                    region_name=self.region, profile_name=self.profile
+                )
+            return self._session
 
     def aws_client(self, service_name):
-        return self.aws_session.client(service_name)
+        with self._lock:
+            if service_name not in self._clients:
+                self._clients[service_name] = self.aws_session.client(
+                    service_name, config=self.config
+                )
+            return self._clients[service_name]
 
     @property
     def ec2_client(self):
-        return self.aws_session.client("ec2")
+        return self.aws_client("ec2")
 
     @property
     def s3_client(self):
-        return self.aws_session.client("s3")
+        return self.aws_client("s3")
 
     def get_service(self, service_name):
         module = self.__module__.split(".")
@@ -41,7 +88,12 @@ class AwsClient:
         return service
 
     def service_factory(self, service_name):
-        return self.get_service(service_name)(aws_client=self)
+        with self._lock:
+            if service_name not in self._services:
+                self._services[service_name] = self.get_service(service_name)(
+                    aws_client=self
+                )
+            return self._services[service_name]
 
     @property
     def s3_service(self):
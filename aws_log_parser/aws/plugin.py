@@ -27,6 +27,10 @@ class AwsPluginBase:
 
         return self._cache
 
+    def set_attr(self, log_entry, value):
+        # Entries are frozen, bypass the dataclass __setattr__.
+        object.__setattr__(log_entry, self.attr_name, value)
+
     def query(self, _):
         raise NotImplementedError
 
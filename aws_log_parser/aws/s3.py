@@ -1,13 +1,26 @@
+import itertools
 import re
 
+from contextlib import contextmanager
 from dataclasses import dataclass
-from io import BytesIO
 
 from .client import (
     AwsClient,
     AwsService,
 )
-from ..io import FileIterator
+from ..io import FileIterator, file_offset
+from ..util import prefetch
+
+
+def overlaps(window, since=None, until=None):
+    """
+    Whether the ``(start, end)`` time range ``window`` overlaps the window
+    from ``since`` to ``until``. An unknown range always does.
+    """
+    if window is None:
+        return True
+    start, end = window
+    return (since is None or end >= since) and (until is None or start < until)
 
 
 @dataclass
@@ -18,32 +31,311 @@ class S3Service(AwsService):
     def client(self):
         return self.aws_client.aws_client("s3")
 
+    def iter_files(self, bucket, prefix):
+        """
+        Yield the objects under ``prefix`` in key order, page by page.
+        """
+        paginator = self.client.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket,
+            Prefix=prefix,
+        )
+        for page in paginator:
+            # Empty listings have no Contents.
+            yield from page.get("Contents", ())
+
     def list_files(self, bucket, prefix, sort_key, reverse=True):
+        return sorted(
+            self.iter_files(bucket, prefix), key=lambda x: x[sort_key], reverse=reverse
+        )
+
+    def list_prefixes(self, bucket, prefix, delimiter, start_after=None):
+        options = {"StartAfter": start_after} if start_after else {}
         paginator = self.client.get_paginator("list_objects_v2").paginate(
             Bucket=bucket,
             Prefix=prefix,
+            Delimiter=delimiter,
+            **options,
         )
+        for page in paginator:
+            for common_prefix in page.get("CommonPrefixes", ()):
+                yield common_prefix["Prefix"]
+
+    def list_partitions(
+        self,
+        bucket,
+        prefix,
+        layout,
+        since=None,
+        until=None,
+        resume=None,
+        level=0,
+        start_after=None,
+    ):
+        """
+        Yield the key prefixes of the daily partitions under ``prefix`` in key
+        order, walking down the levels of ``layout``. Levels that ``prefix``
+        already reaches aren't listed, years, months and days out of the
+        ``since`` to ``until`` window are skipped.
+
+        :param resume: Return the key to list the partitions under a log
+            prefix, matched by the first level, after. None lists them all.
+        """
+        if level == len(layout.levels):
+            yield prefix
+            return
+        pattern, delimiter = layout.levels[level]
+        match = re.match(pattern, prefix)
+        if match:
+            matches = [match]
+        else:
+            matches = (
+                re.match(pattern, child)
+                for child in self.list_prefixes(bucket, prefix, delimiter, start_after)
+            )
+        for match in matches:
+            if not match or not overlaps(layout.prefix_window(match), since, until):
+                continue
+            if level == 0 and resume:
+                start_after = resume(match.group(0))
+            yield from self.list_partitions(
+                bucket,
+                match.string,
+                layout,
+                since,
+                until,
+                resume,
+                level + 1,
+                start_after,
+            )
+
+    def list_partitioned_files(
+        self,
+        bucket,
+        prefix,
+        layout,
+        concurrency=1,
+        since=None,
+        until=None,
+        resume=None,
+    ):
+        """
+        Yield the objects under ``prefix`` in key order as its daily
+        partitions are listed, ``concurrency`` partitions at a time. When no
+        partitions of ``layout`` are found the prefix is listed as is.
+        """
+        partitions = self.list_partitions(bucket, prefix, layout, since, until, resume)
+        first = next(partitions, None)
+        if first is None:
+            yield from self.iter_files(bucket, prefix)
+            return
+        partitions = itertools.chain([first], partitions)
+        if concurrency <= 1:
+            for partition in partitions:
+                yield from self.iter_files(bucket, partition)
+            return
+
+        for files in prefetch(
+            lambda partition: list(self.iter_files(bucket, partition)),
+            partitions,
+            concurrency,
+        ):
+            yield from files
+
+    @contextmanager
+    def open_key(self, bucket, key, etag=None, cache=None, resume_from=0, **options):
+        """
+        Open ``key`` as a ``FileIterator`` reading it from ``resume_from``, a
+        byte offset or ``FileOffset``, on. With an ``ObjectCache`` the object
+        is downloaded to the cache unless its ``etag`` version is cached, and
+        read from there. Otherwise only the bytes from the offset on are
+        requested.
+        """
+        resume_from = file_offset(resume_from)
+        gzipped = key.endswith(".gz")
+        body = None
+        if cache is not None:
+            fh, cached = self.open_cached(bucket, key, etag, cache)
+            if cached:
+                with fh:
+                    fh.seek(resume_from.offset)
+                    yield FileIterator(
+                        fileobj=fh,
+                        gzipped=gzipped,
+                        mmap=True,
+                        resume_from=resume_from,
+                        **options,
+                    )
+                return
+            if resume_from.offset:
+                # Skipping to the offset would download what was already read.
+                fh.close()
+            else:
+                body = fh
 
-        items = [item for page in paginator for item in page["Contents"]]
+        if body is None:
+            if self.aws_client.verbose:
+                print(f"Reading s3://{bucket}/{key}")
+            request = (
+                {"Range": f"bytes={resume_from.offset}-"} if resume_from.offset else {}
+            )
+            body = self.client.get_object(Bucket=bucket, Key=key, **request)["Body"]
+        try:
+            yield FileIterator(
+                fileobj=body,
+                gzipped=gzipped,
+                resume_from=resume_from,
+                **options,
+            )
+        finally:
+            body.close()
 
-        return sorted(items, key=lambda x: x[sort_key], reverse=reverse)
+    def open_cached(self, bucket, key, etag, cache):
+        """
+        Open the cached ``key``, downloaded to ``cache`` unless its ``etag``
+        version is cached. Return the file and whether it is cached, objects
+        larger than the cache aren't and the response body is returned.
+        """
+        if etag is None:
+            etag = self.client.head_object(Bucket=bucket, Key=key)["ETag"]
+        fh = cache.open(bucket, key, etag)
+        if fh is not None:
+            if self.aws_client.verbose:
+                print(f"Reading s3://{bucket}/{key} from the cache")
+            return fh, True
 
-    def read_key(self, bucket, key):
+        # The object must not change between the listing and the download.
+        response = self.client.get_object(Bucket=bucket, Key=key, IfMatch=etag)
+        body = response["Body"]
+        if response.get("ContentLength", 0) > cache.max_size:
+            if self.aws_client.verbose:
+                print(f"Reading s3://{bucket}/{key}, larger than the cache")
+            return body, False
         if self.aws_client.verbose:
-            print(f"Reading s3://{bucket}/{key}")
-        contents = self.client.get_object(Bucket=bucket, Key=key)
-        yield from FileIterator(
-            fileobj=BytesIO(contents["Body"].read()),
-            gzipped=key.endswith(".gz"),
-        )
+            print(f"Caching s3://{bucket}/{key}")
+        try:
+            return cache.store(bucket, key, etag, body), True
+        finally:
+            body.close()
+
+    def read_key(self, bucket, key, etag=None, cache=None, resume_from=0, **options):
+        """
+        Yield the lines of ``key``, see ``open_key``.
+        """
+        with self.open_key(bucket, key, etag, cache, resume_from, **options) as lines:
+            yield from lines
+
+    def read_key_batches(
+        self, bucket, key, etag=None, cache=None, resume_from=0, **options
+    ):
+        """
+        Yield the batches of lines of ``key`` with the ``FileOffset`` to
+        resume reading after them from, see ``open_key``.
+        """
+        with self.open_key(bucket, key, etag, cache, resume_from, **options) as lines:
+            yield from lines.batches()
+
+    def fetch_key(self, bucket, key, **options):
+        return list(self.read_key(bucket, key, **options))
 
-    def read_keys(self, bucket, prefix, endswith=None, regex_filter=None):
+    def list_objects(
+        self,
+        bucket,
+        prefix,
+        endswith=None,
+        regex_filter=None,
+        layout=None,
+        concurrency=1,
+        since=None,
+        until=None,
+        resume=None,
+    ):
+        """
+        Yield the matching objects, the most recently modified first. With a
+        ``layout`` the objects are streamed in key order from its daily
+        partitions instead, see ``list_partitioned_files``.
+
+        :param since: Skip the keys modified before this UTC datetime, and
+            with a ``layout`` those whose name is out of the window.
+        :param until: With a ``layout``, skip the keys whose name is out of
+            the window ending at this UTC datetime.
+        :param resume: With a ``layout``, skip the partitions before a key,
+            see ``list_partitions``.
+        """
         reo = re.compile(regex_filter) if regex_filter else None
-        for file in self.list_files(bucket, prefix, "LastModified"):
+        files = (
+            self.list_partitioned_files(
+                bucket, prefix, layout, concurrency, since, until, resume
+            )
+            if layout
+            else self.list_files(bucket, prefix, "LastModified")
+        )
+        for file in files:
             if endswith and not file["Key"].endswith(endswith):
                 continue
 
             if reo and not reo.match(file["Key"]):
                 continue
 
-            yield from self.read_key(bucket, file["Key"])
+            # Objects are written after the logs they hold.
+            if since and file["LastModified"] < since:
+                continue
+
+            if layout and not overlaps(layout.key_window(file["Key"]), since, until):
+                continue
+
+            yield file
+
+    def list_keys(self, *args, **kwargs):
+        """
+        Yield the keys of the matching objects, see ``list_objects``.
+        """
+        for file in self.list_objects(*args, **kwargs):
+            yield file["Key"]
+
+    def read_keys(
+        self,
+        bucket,
+        prefix,
+        endswith=None,
+        regex_filter=None,
+        concurrency=1,
+        ordered=True,
+        layout=None,
+        since=None,
+        until=None,
+        cache=None,
+        **options,
+    ):
+        """
+        Yield the lines of every matching key. With ``concurrency`` above one
+        the objects are fetched in a thread pool and each object's lines are
+        yielded once it has been read completely.
+
+        :param ordered: Yield objects in listing order, otherwise in the order
+            the fetches complete.
+        :param layout: List the keys from the daily partitions of this
+            ``KeyLayout``, ``concurrency`` at a time.
+        :param since: Skip the keys out of the window, see ``list_keys``.
+        :param until: Skip the keys out of the window, see ``list_keys``.
+        :param cache: Read the objects through this ``ObjectCache``.
+        :param options: Passed to ``FileIterator``, e.g. ``json_objects``.
+        """
+        files = self.list_objects(
+            bucket, prefix, endswith, regex_filter, layout, concurrency, since, until
+        )
+        if concurrency <= 1:
+            for file in files:
+                yield from self.read_key(
+                    bucket, file["Key"], etag=file.get("ETag"), cache=cache, **options
+                )
+            return
+
+        for lines in prefetch(
+            lambda file: self.fetch_key(
+                bucket, file["Key"], etag=file.get("ETag"), cache=cache, **options
+            ),
+            files,
+            concurrency,
+            ordered=ordered,
+        ):
+            yield from lines
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import tempfile
+import threading
+import typing
+
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .io import DEFAULT_CHUNK_SIZE
+
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
+
+# Partially written entries, skipped by lookups and eviction.
+TEMP_PREFIX = "."
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # Bytes read from the cache rather than downloaded.
+    bytes_saved: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class ObjectCache:
+    """
+    A directory of downloaded S3 objects keyed by bucket, key and ETag, so a
+    changed object is downloaded again. The least recently used entries are
+    evicted once the directory holds more than ``max_size`` bytes.
+
+    Several threads and processes can share the directory: entries are
+    written to a temporary file and renamed into place, and are opened before
+    anyone can evict them, an evicted entry stays readable while it is open.
+    """
+
+    path: Path
+    max_size: int = DEFAULT_CACHE_SIZE
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    stats: CacheStats = field(default_factory=CacheStats, init=False, compare=False)
+    # The size of the directory as of the last eviction, plus what was added.
+    _size: typing.Optional[int] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _lock: typing.Any = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.path = Path(self.path).expanduser()
+
+    def __getstate__(self):
+        # Locks can't be pickled, worker processes keep their own stats.
+        state = self.__dict__.copy()
+        state.update(stats=CacheStats(), _size=None, _lock=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def entry_path(self, bucket, key, etag):
+        digest = hashlib.sha256(f"{bucket}/{key}/{etag}".encode()).hexdigest()
+        # Keep the suffix gzipped keys are recognized by.
+        suffix = ".gz" if key.endswith(".gz") else ""
+        return self.path / digest[:2] / f"{digest}{suffix}"
+
+    def open(self, bucket, key, etag):
+        """
+        Open the cached object, None if it isn't cached.
+        """
+        path = self.entry_path(bucket, key, etag)
+        try:
+            fh = path.open("rb")
+        except FileNotFoundError:
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        # The modification time orders the entries for eviction.
+        with suppress(FileNotFoundError):
+            os.utime(path)
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.bytes_saved += os.fstat(fh.fileno()).st_size
+        return fh
+
+    def store(self, bucket, key, etag, body):
+        """
+        Write the object read from ``body`` to the cache and open it.
+        """
+        path = self.entry_path(bucket, key, etag)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while data := body.read(self.chunk_size):
+                    out.write(data)
+            fh = open(temp_path, "rb")
+            os.replace(temp_path, path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.unlink(temp_path)
+            raise
+        self.added(os.fstat(fh.fileno()).st_size)
+        return fh
+
+    def entries(self):
+        for directory in self.path.iterdir():
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                if path.name.startswith(TEMP_PREFIX):
+                    continue
+                with suppress(FileNotFoundError):
+                    yield path, path.stat()
+
+    def added(self, size):
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+                if self._size <= self.max_size:
+                    return
+            self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the directory holds at
+        most ``max_size`` bytes. The directory is listed again as other
+        processes may have added or removed entries.
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[1].st_mtime)
+        size = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if size <= self.max_size:
+                break
+            with suppress(FileNotFoundError):
+                path.unlink()
+                self.stats.evictions += 1
+            size -= stat.st_size
+        self._size = size
@@ -0,0 +1,133 @@
+import datetime
+import sqlite3
+import threading
+import typing
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    etag TEXT,
+    size INTEGER,
+    mtime TEXT,
+    partition TEXT,
+    processed_at TEXT NOT NULL,
+    windowed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS processed_partition ON processed (source, partition);
+"""
+
+
+def object_version(file):
+    """
+    The ``(etag, size, mtime)`` a listed object, or local file, is processed
+    at. Local files have no ETag.
+    """
+    mtime = file.get("LastModified")
+    return (
+        file.get("ETag"),
+        file.get("Size"),
+        None if mtime is None else str(mtime),
+    )
+
+
+@dataclass
+class CheckpointStore:
+    """
+    A SQLite database of the S3 objects and local files fully processed,
+    with the version they were processed at. ``source`` is the bucket url,
+    or file:// for local files.
+    """
+
+    path: Path
+
+    _connection: typing.Optional[sqlite3.Connection] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _lock: typing.Any = field(
+        default_factory=threading.RLock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.path = Path(self.path).expanduser()
+
+    def __getstate__(self):
+        # Connections and locks can't be pickled, workers reconnect lazily.
+        state = self.__dict__.copy()
+        state.update(_connection=None, _lock=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self):
+        with self._lock:
+            if self._connection is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                # Concurrent jobs read while another one writes.
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+                self._connection = connection
+            return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def processed(self, source, file):
+        """
+        Whether ``file``, a listed object or a local file, was processed at
+        its current version.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT etag, size, mtime FROM processed WHERE source = ? AND key = ?",
+                (source, file["Key"]),
+            ).fetchone()
+        return row == object_version(file)
+
+    def mark(self, source, file, partition=None, windowed=False):
+        """
+        Record ``file`` as processed at its current version, by a run with a
+        time window if ``windowed``.
+        """
+        with self._lock, self.connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    source,
+                    file["Key"],
+                    *object_version(file),
+                    partition,
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    windowed,
+                ),
+            )
+
+    def start_after(self, source, prefix):
+        """
+        Return the key to resume listing the daily partitions under
+        ``prefix`` after, None without processed partitions. As logs are
+        delivered late, the last two processed partitions are listed again.
+        Partitions processed by windowed runs are left out, the partitions
+        before them may not have been processed.
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT partition FROM processed"
+                " WHERE source = ? AND substr(partition, 1, ?) = ? AND NOT windowed"
+                " ORDER BY partition DESC LIMIT 2",
+                (source, len(prefix), prefix),
+            ).fetchall()
+        if not rows:
+            return None
+        return rows[-1][0]
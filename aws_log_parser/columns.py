@@ -0,0 +1,119 @@
+import datetime
+import functools
+import itertools
+import typing
+
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .parser import field_type_of, model_converters
+
+EPOCH = np.datetime64("1970-01-01T00:00:00", "us")
+
+
+@dataclass(frozen=True)
+class DictionaryColumn:
+    """
+    A dictionary encoded column, ``values[codes]`` gives the decoded values.
+    """
+
+    codes: np.ndarray
+    values: np.ndarray
+
+    def __len__(self):
+        return len(self.codes)
+
+    def decode(self):
+        return self.values[self.codes]
+
+
+def missing_mask(column):
+    return (column == "-") | (column == "")
+
+
+def to_numeric_column(column, dtype):
+    missing = missing_mask(column)
+    if not missing.any():
+        return column.astype(dtype)
+    column = np.where(missing, "0", column)
+    return np.ma.masked_array(column.astype(dtype), missing)
+
+
+def to_datetime_column(column, unit="us"):
+    # numpy doesn't parse time zones, the logs are all in UTC.
+    column = np.char.rstrip(np.char.strip(column, '"'), "Z")
+    return np.where(missing_mask(column), "NaT", column).astype(f"datetime64[{unit}]")
+
+
+def to_time_column(column):
+    return to_datetime_column(np.char.add("1970-01-01T", column)) - EPOCH
+
+
+def to_dictionary_column(column, converter):
+    values, codes = np.unique(column, return_inverse=True)
+    # Only the distinct values go through the row converter.
+    decoded = np.empty(len(values), dtype=object)
+    for index, value in enumerate(values.tolist()):
+        decoded[index] = converter(value)
+    return DictionaryColumn(codes=codes.reshape(-1), values=decoded)
+
+
+def column_converter(field, converter):
+    """
+    Return the callable that converts a column of raw values for ``field``.
+    """
+    field_type = field_type_of(field)
+
+    if field_type is int:
+        return functools.partial(to_numeric_column, dtype=np.int64)
+    if field_type is float:
+        return functools.partial(to_numeric_column, dtype=np.float64)
+    if field_type is datetime.datetime:
+        return to_datetime_column
+    if field_type is datetime.date:
+        return functools.partial(to_datetime_column, unit="D")
+    if field_type is datetime.time:
+        return to_time_column
+    return functools.partial(to_dictionary_column, converter=converter)
+
+
+def column_converters(model, names=None):
+    """
+    Return ``(index, name, column converter)`` for the ``names`` fields of
+    ``model``, all of them without ``names``.
+
+    :raise ValueError: If a name is not a field of ``model``.
+    """
+    model_fields = fields(model)
+    field_names = [model_field.name for model_field in model_fields]
+    unknown = set(names or ()) - set(field_names)
+    if unknown:
+        raise ValueError(f"Unknown fields {', '.join(sorted(unknown))}")
+
+    return tuple(
+        (index, model_field.name, column_converter(model_field, converter))
+        for index, (model_field, converter) in enumerate(
+            zip(model_fields, model_converters(model))
+        )
+        if names is None or model_field.name in names
+    )
+
+
+def to_columns(converters, rows):
+    """
+    Convert a batch of raw CSV rows into a dict of arrays keyed by field name.
+    Missing values are masked in numeric columns and ``NaT`` in time columns.
+    """
+    missing = b"-" if rows and isinstance(rows[0][0], bytes) else "-"
+    columns = list(itertools.zip_longest(*rows, fillvalue=missing))
+    batch: typing.Dict[str, typing.Any] = {}
+    for index, name, converter in converters:
+        column = np.array(
+            columns[index] if index < len(columns) else (missing,) * len(rows)
+        )
+        if column.dtype.kind == "S":
+            # Rows of the bytes tokenizer.
+            column = np.char.decode(column, "utf-8")
+        batch[name] = converter(column.astype(str))
+    return batch
@@ -1,23 +1,121 @@
+import copy
 import csv
+import dataclasses
+import datetime
 import typing
 import importlib
 import importlib.util
+import itertools
+import operator
 import re
 import sys
 
-from dataclasses import dataclass, fields, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from urllib.parse import urlparse
 
 from .aws import AwsClient
-from .io import FileIterator
+from .cache import DEFAULT_CACHE_SIZE, ObjectCache
+from .checkpoints import CheckpointStore
+from .io import FileIterator, byte_ranges
+from .tokenizers import elb_pattern, tokenize_bytes, tokenize_elb
 from .models import (
     LogFormat,
     LogFormatType,
+    record_model,
+    slotted_model,
 )
-from .util import batcher
+from .util import batcher, prefetch
+
+from .parser import (
+    MEMOIZABLE,
+    SLOTTED_FUNCS,
+    InternPool,
+    bytes_converters,
+    compile_filters,
+    compile_window,
+    in_window,
+    interned_converters,
+    json_decoder,
+    json_loads,
+    lazy_model,
+    memoized_funcs,
+    model_converters,
+    projected_converters,
+    row_in_window,
+    row_matches,
+    to_predicate,
+    to_timestamp,
+    to_utc,
+)
+
+
+RECORD_TYPES = (None, "tuple", "namedtuple", "raw")
+
+TOKENIZERS = ("csv", "bytes", "elb")
+
+
+def record_defaults(model):
+    """
+    The defaults of the trailing fields of ``model``, short rows are padded
+    with.
+    """
+    return tuple(record_model(model)._field_defaults.values())
+
+
+def pad_tuple(values, size, defaults):
+    missing = size - len(values)
+    if missing > len(defaults):
+        raise TypeError(f"Missing {missing - len(defaults)} required fields")
+    return values + defaults[len(defaults) - missing :]
+
+
+# The parser of a worker process, sent once by ``init_worker``.
+_worker_parser = None
+
+
+def init_worker(parser):
+    global _worker_parser
+    _worker_parser = parser
+
+
+def parse_worker_batch(func, batch):
+    return func(_worker_parser, batch)
+
+
+def parse_files_batch(parser, paths):
+    return [entry for path in paths for entry in parser.read_file(path)]
+
+
+def parse_listed_files_batch(parser, files):
+    return parse_files_batch(parser, [file["Key"] for file in files])
+
+
+def parse_ranges_batch(parser, ranges):
+    return [
+        entry
+        for path, start, end in ranges
+        for entry in parser.read_file(path, start, end)
+    ]
 
-from .parser import to_python
+
+def parse_keys_batch(parser, files, bucket):
+    s3_service = parser.aws_client.s3_service
+    return [
+        entry
+        for file in files
+        for entry in parser.parse(
+            s3_service.read_key(
+                bucket,
+                file["Key"],
+                etag=file.get("ETag"),
+                cache=parser.cache,
+                **parser.file_options,
+            )
+        )
+    ]
 
 
 @dataclass
@@ -30,13 +128,80 @@ class AwsLogParser:
     file_suffix: str = ".log"
     regex_filter: typing.Optional[str] = None
     verbose: bool = False
+    fetch_concurrency: int = 1
+    fetch_ordered: bool = True
+    workers: int = 1
+    chunksize: int = 1
+    max_pool_connections: typing.Optional[int] = None
+    retry_mode: typing.Optional[str] = None
+    fields: typing.Optional[typing.List[str]] = None
+    filters: typing.Optional[typing.List[typing.Tuple[str, str, typing.Any]]] = None
+    lazy: bool = False
+    intern_strings: bool = True
+    memoize: bool = False
+    memoize_size: int = 1024 * 16
+    slots: bool = False
+    record_type: typing.Optional[str] = None
+    tokenizer: str = "csv"
+    mmap: bool = False
+    partitioned_listing: bool = False
+    since: typing.Optional[datetime.datetime] = None
+    until: typing.Optional[datetime.datetime] = None
+    cache_dir: typing.Optional[typing.Union[str, Path]] = None
+    cache_size: int = DEFAULT_CACHE_SIZE
+    checkpoint_path: typing.Optional[typing.Union[str, Path]] = None
+    incremental: bool = False
 
     plugin_paths: typing.List[typing.Union[str, Path]] = field(default_factory=list)
     plugins: typing.List[str] = field(default_factory=list)
 
     def __post_init__(self):
+        if self.record_type not in RECORD_TYPES:
+            raise ValueError(f"Unknown record_type {self.record_type}")
+        if self.record_type and (self.lazy or self.plugins):
+            raise ValueError("Records can't be lazy or augmented by plugins")
+        if self.record_type == "raw" and self.log_type.type != LogFormatType.CSV:
+            raise ValueError("Raw records are only supported for CSV log types")
+        if self.tokenizer not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer {self.tokenizer}")
+        if self.tokenizer == "bytes" and self.lazy:
+            raise ValueError("Lazy entries need the csv tokenizer")
+        if self.tokenizer == "elb" and not self.log_type.quoted:
+            raise ValueError("The elb tokenizer only reads load balancer logs")
+        if self.partitioned_listing and not self.log_type.key_layout:
+            raise ValueError("Partitioned listing needs a log type with a key layout")
+        if self.incremental and not self.checkpoint_path:
+            raise ValueError("Incremental runs need a checkpoint_path")
+
         self.aws_client = AwsClient(
-            region=self.region, profile=self.profile, verbose=self.verbose
+            region=self.region,
+            profile=self.profile,
+            verbose=self.verbose,
+            # Give every concurrent fetch its own pooled connection.
+            max_pool_connections=self.max_pool_connections
+            or (self.fetch_concurrency if self.fetch_concurrency > 10 else None),
+            retry_mode=self.retry_mode,
+        )
+
+        self.cache = (
+            ObjectCache(Path(self.cache_dir), self.cache_size)
+            if self.cache_dir
+            else None
+        )
+        self.checkpoints = (
+            CheckpointStore(Path(self.checkpoint_path))
+            if self.checkpoint_path
+            else None
+        )
+
+        self.memoized = self.build_memoized()
+        self.intern_pools = (
+            {
+                name: InternPool(self.log_type.intern_size)
+                for name in self.log_type.interned
+            }
+            if self.intern_strings
+            else {}
         )
 
         self.plugins_loaded = [
@@ -47,6 +212,114 @@ class AwsLogParser:
             for plugin in self.plugins
         ]
 
+    def __getstate__(self):
+        # The LRU caches can't be pickled, worker processes build their own.
+        state = self.__dict__.copy()
+        state["memoized"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.memoized = self.build_memoized()
+
+    def __copy__(self):
+        # Copies share the LRU caches, only pickled parsers build their own.
+        copied = object.__new__(type(self))
+        copied.__dict__.update(self.__dict__)
+        return copied
+
+    def overridden(self, **overrides):
+        """
+        Return a shallow copy of the parser with ``overrides`` set. Unlike
+        ``dataclasses.replace`` the copy shares the AWS client, the object
+        cache and the memoized converters.
+        """
+        parser = copy.copy(self)
+        for name, value in overrides.items():
+            setattr(parser, name, value)
+        return parser
+
+    def build_memoized(self):
+        if not self.memoize:
+            return None
+        return memoized_funcs(
+            self.memoize_size, SLOTTED_FUNCS if self.slots else MEMOIZABLE
+        )
+
+    @property
+    def converter_funcs(self):
+        return self.memoized or (SLOTTED_FUNCS if self.slots else None)
+
+    @property
+    def model(self):
+        """
+        The model entries are built with, its slotted variant with ``slots``.
+        """
+        if self.slots:
+            return slotted_model(self.log_type.model)
+        return self.log_type.model
+
+    @property
+    def record(self):
+        """
+        Build an entry from its decoded values in model field order.
+        """
+        if self.record_type == "tuple":
+            return lambda *values: values
+        if self.record_type == "namedtuple":
+            return record_model(self.log_type.model)
+        return self.model
+
+    @property
+    def file_options(self):
+        """
+        How ``FileIterator`` splits files: JSON objects for the JSON log types,
+        lines of bytes for the bytes tokenizer and decoded lines otherwise.
+        """
+        if self.log_type.type == LogFormatType.JSON:
+            return {"json_objects": True}
+        return {"binary": self.tokenizer == "bytes"}
+
+    @property
+    def quoted(self):
+        """
+        Whether the converters strip quotes off the columns, the elb tokenizer
+        only yields unquoted columns.
+        """
+        return self.tokenizer != "elb"
+
+    def tokenize(self, content, limit=None):
+        """
+        Yield the columns of the log lines in ``content``, comments excluded.
+        The bytes and elb tokenizers may skip the columns past the first
+        ``limit``.
+        """
+        assert self.log_type.delimiter
+        size = len(dataclasses.fields(self.log_type.model)) if limit is not None else 0
+        if self.tokenizer == "bytes":
+            yield from tokenize_bytes(content, self.log_type.delimiter, limit, size)
+            return
+        if self.tokenizer == "elb":
+            pattern = elb_pattern(self.log_type.model, self.log_type.quoted, limit)
+            yield from tokenize_elb(content, pattern, size)
+            return
+        for row in csv.reader(content, delimiter=self.log_type.delimiter):
+            if not row[0].startswith("#"):
+                yield row
+
+    def column_converters(self, model, converters):
+        if self.tokenizer == "bytes":
+            return bytes_converters(model, converters)
+        return converters
+
+    def cache_info(self):
+        """
+        Return the ``functools`` cache statistics of the memoized converters.
+        """
+        if not self.memoized:
+            return {}
+        return {name: func.cache_info() for name, func in self.memoized.items()}
+
     def load_plugin(self, plugin, plugin_path):
         plugin_module, plugin_classs = plugin.split(":")
         spec = importlib.util.spec_from_file_location(
@@ -64,21 +337,186 @@ class AwsLogParser:
         for batch in batcher(log_entries, plugin.batch_size):
             yield from plugin.augment(batch)
 
+    @property
+    def window(self):
+        """
+        The ``(since, until)`` time window of the entries, as UTC datetimes.
+        """
+        return to_utc(self.since), to_utc(self.until)
+
+    def column_limit(self):
+        """
+        The number of leading columns holding the projected, filtered and
+        windowed fields, None without projection. Lazy entries can decode any
+        field on access, so they get every column.
+        """
+        if self.fields is None or self.record_type == "raw" or self.lazy:
+            return None
+        names = set(self.fields) | {name for name, _, _ in self.filters or ()}
+        if self.since or self.until:
+            names |= set(self.log_type.timestamp_fields)
+        indexes = [
+            index
+            for index, model_field in enumerate(dataclasses.fields(self.log_type.model))
+            if model_field.name in names
+        ]
+        return max(indexes, default=-1) + 1
+
     def parse_csv(self, content):
-        model_fields = fields(self.log_type.model)
-        assert self.log_type.delimiter
-        for row in csv.reader(content, delimiter=self.log_type.delimiter):
-            if not row[0].startswith("#"):
-                yield self.log_type.model(
+        model = self.log_type.model
+        rows = self.tokenize(content, self.column_limit())
+
+        if self.filters:
+            compiled_filters = compile_filters(
+                model,
+                self.filters,
+                self.column_converters(
+                    model, model_converters(model, quoted=self.quoted)
+                ),
+            )
+            rows = (row for row in rows if row_matches(compiled_filters, row))
+
+        since, until = self.window
+        if since or until:
+            compiled_window = compile_window(
+                model,
+                self.log_type.timestamp_fields,
+                self.column_converters(
+                    model, model_converters(model, quoted=self.quoted)
+                ),
+            )
+            rows = (
+                row for row in rows if row_in_window(compiled_window, row, since, until)
+            )
+
+        if self.record_type == "raw":
+            yield from rows
+            return
+
+        if self.lazy:
+            from_row = lazy_model(model).from_row
+            for row in rows:
+                yield from_row(row)
+            return
+
+        model = self.model
+        if self.fields is not None:
+            # Columns outside of the projection are left as None.
+            converters = self.column_converters(
+                model,
+                interned_converters(
+                    model,
+                    projected_converters(
+                        model,
+                        frozenset(self.fields),
+                        model_converters(model, self.converter_funcs, self.quoted),
+                    ),
+                    self.intern_pools,
+                ),
+            )
+        else:
+            converters = self.column_converters(
+                model,
+                interned_converters(
+                    model,
+                    model_converters(model, self.converter_funcs, self.quoted),
+                    self.intern_pools,
+                ),
+            )
+
+        if self.record_type == "tuple":
+            yield from self.parse_tuples(rows, converters)
+            return
+
+        record = self.record
+        if self.fields is not None:
+            for row in rows:
+                yield record(
                     *[
-                        to_python(value, field)
-                        for value, field in zip(row, model_fields)
+                        converter(value) if converter else None
+                        for converter, value in zip(converters, row)
                     ]
                 )
+            return
+
+        for row in rows:
+            yield record(
+                *[converter(value) for converter, value in zip(converters, row)]
+            )
+
+    def parse_tuples(self, rows, converters):
+        """
+        Yield the rows decoded as plain tuples, short rows padded with the
+        trailing field defaults.
+        """
+        size = len(converters)
+        defaults = record_defaults(self.log_type.model)
+        if self.fields is not None:
+            for row in rows:
+                values = tuple(
+                    [
+                        converter(value) if converter else None
+                        for converter, value in zip(converters, row)
+                    ]
+                )
+                yield (
+                    values if len(values) == size else pad_tuple(values, size, defaults)
+                )
+            return
+
+        for row in rows:
+            values = tuple(
+                [converter(value) for converter, value in zip(converters, row)]
+            )
+            yield values if len(values) == size else pad_tuple(values, size, defaults)
 
     def parse_json(self, records):
-        for record in records:
-            yield self.log_type.model.from_json(record)  # type: ignore
+        decode = json_decoder(self.model)
+        # Records are text, or objects already decoded by ``FileIterator``.
+        log_entries = (
+            decode(record if isinstance(record, dict) else json_loads(record))
+            for record in records
+        )
+        if self.filters:
+            # JSON records are filtered once decoded.
+            predicates = [
+                (name, to_predicate(op, operand)) for name, op, operand in self.filters
+            ]
+            log_entries = (
+                log_entry
+                for log_entry in log_entries
+                if all(
+                    predicate(getattr(log_entry, name))
+                    for name, predicate in predicates
+                )
+            )
+        since, until = self.window
+        if since or until:
+            names = self.log_type.timestamp_fields
+            log_entries = (
+                log_entry
+                for log_entry in log_entries
+                if in_window(
+                    to_timestamp(*[getattr(log_entry, name) for name in names]),
+                    since,
+                    until,
+                )
+            )
+        if self.record_type:
+            values = operator.attrgetter(
+                *[
+                    model_field.name
+                    for model_field in dataclasses.fields(self.log_type.model)
+                ]
+            )
+            record = self.record
+            log_entries = (record(*values(log_entry)) for log_entry in log_entries)
+        yield from log_entries
+
+    def run_plugins(self, log_entries):
+        for plugin in self.plugins_loaded:
+            log_entries = self.run_plugin(plugin, log_entries)
+        yield from log_entries
 
     def parse(self, content):
         parse_func = (
@@ -86,18 +524,102 @@ class AwsLogParser:
             if self.log_type.type == LogFormatType.JSON
             else self.parse_csv
         )
-        log_entries = parse_func(content)
-        for plugin in self.plugins_loaded:
-            log_entries = self.run_plugin(plugin, log_entries)
-        yield from log_entries
+        yield from self.run_plugins(parse_func(content))
+
+    def parse_parallel(self, func, items):
+        """
+        Run ``func(parser, batch)`` over batches of ``chunksize`` items in a
+        pool of ``workers`` processes and yield the parsed entries. Plugins
+        are applied here rather than in the workers.
+        """
+        batches = self.worker_batches(
+            func, batcher(items, self.chunksize), self.fetch_ordered
+        )
+        yield from self.run_plugins(entry for batch in batches for entry in batch)
+
+    def worker_batches(self, func, batches, ordered=True):
+        """
+        Yield ``func(parser, batch)`` for the ``batches`` in a pool of
+        ``workers`` processes. The parser is sent once to every process, so
+        its AWS clients and caches last across the batches.
+        """
+        return prefetch(
+            partial(parse_worker_batch, func),
+            batches,
+            self.workers,
+            ordered=ordered,
+            executor_class=ProcessPoolExecutor,
+            initializer=init_worker,
+            initargs=(self.overridden(plugins_loaded=[], workers=1),),
+        )
+
+    def parse_checkpointed(
+        self, source, files, lines, parse_batch, concurrency=1, partition=None
+    ):
+        """
+        Yield the entries of the ``files``, listed S3 objects or local files,
+        not processed at their current version yet, and checkpoint each file
+        once all of its entries have been yielded.
+
+        :param lines: Return the lines of a file, fetched ``concurrency`` at a
+            time.
+        :param parse_batch: With ``workers``, parse a batch of files in a
+            worker process, see ``parse_parallel``.
+        :param partition: Return the daily partition of a key.
+        """
+        files = (file for file in files if not self.checkpoints.processed(source, file))
+        files, pending = itertools.tee(files)
+        if self.workers > 1:
+            results = (
+                self.run_plugins(entries)
+                for entries in self.worker_batches(
+                    parse_batch, ([file] for file in pending)
+                )
+            )
+        elif concurrency > 1:
+            results = (
+                self.parse(file_lines)
+                for file_lines in prefetch(
+                    lambda file: list(lines(file)), pending, concurrency
+                )
+            )
+        else:
+            results = (self.parse(lines(file)) for file in pending)
 
-    def read_file(self, path):
+        since, until = self.window
+        for file, entries in zip(files, results):
+            yield from entries
+            self.checkpoints.mark(
+                source,
+                file,
+                partition(file["Key"]) if partition else None,
+                windowed=bool(since or until),
+            )
+
+    def file_lines(self, path, start=0, end=None, resume_from=0):
+        return FileIterator(
+            path,
+            gzipped=path.suffix == ".gz",
+            mmap=self.mmap,
+            start=start,
+            end=end,
+            resume_from=resume_from,
+            **self.file_options,
+        )
+
+    def read_file(self, path, start=0, end=None):
         """
         Yield parsed log entries from the given file.
         Low level function used by ``parse_files``.
 
         :param path: The path to the file.
         :type kind: str
+        :param start: With ``mmap``, only read the lines starting from this
+            byte offset of a plain file.
+        :type kind: int
+        :param end: With ``mmap``, only read the lines starting before this
+            byte offset of a plain file.
+        :type kind: int
         :return: Parsed log entries.
         :rtype: Dependant on log_type.
         """
@@ -105,7 +627,7 @@ class AwsLogParser:
             path = Path(path)
         if self.verbose:
             print(f"Reading file://{path}")
-        yield from self.parse(FileIterator(path, gzipped=path.suffix == ".gz"))
+        yield from self.parse(self.file_lines(path, start, end))
 
     def read_files(self, pathname):
         """
@@ -117,18 +639,59 @@ class AwsLogParser:
         :return: Parsed log entries.
         :rtype: Dependant on log_type.
         """
+        paths = self.list_paths(pathname)
+        if self.incremental:
+            yield from self.parse_checkpointed(
+                "file://",
+                self.stat_files(paths),
+                lambda file: self.file_lines(Path(file["Key"])),
+                parse_listed_files_batch,
+            )
+        elif self.workers > 1 and self.mmap:
+            yield from self.parse_parallel(parse_ranges_batch, self.list_ranges(paths))
+        elif self.workers > 1:
+            yield from self.parse_parallel(parse_files_batch, paths)
+        else:
+            for path in paths:
+                yield from self.read_file(path)
+
+    def list_paths(self, pathname):
         base_path = Path(pathname)
         if base_path.is_dir():
             if self.regex_filter:
                 reo = re.compile(self.regex_filter)
                 for path in base_path.iterdir():
                     if reo.match(path.name) and path.is_file():
-                        yield from self.read_file(path)
+                        yield path
             else:
-                for path in base_path.glob(f"**/*{self.file_suffix}"):
-                    yield from self.read_file(path)
+                yield from base_path.glob(f"**/*{self.file_suffix}")
         else:
-            yield from self.read_file(base_path)
+            yield base_path
+
+    def stat_files(self, paths):
+        """
+        Yield the local files like listed S3 objects, to be checkpointed.
+        """
+        for path in paths:
+            stat = path.stat()
+            yield {
+                "Key": str(path.resolve()),
+                "Size": stat.st_size,
+                "LastModified": stat.st_mtime_ns,
+            }
+
+    def list_ranges(self, paths):
+        """
+        Yield ``(path, start, end)`` byte ranges splitting the large plain
+        files of the CSV log types between the workers, which map the same
+        file.
+        """
+        for path in paths:
+            if path.suffix == ".gz" or self.log_type.type != LogFormatType.CSV:
+                yield path, 0, None
+                continue
+            for start, end in byte_ranges(path.stat().st_size, self.workers):
+                yield path, start, end
 
     def read_s3(self, bucket, prefix, endswith=None):
         """
@@ -142,16 +705,80 @@ class AwsLogParser:
         :return: Parsed log entries.
         :rtype: Dependant on log_type.
         """
+        s3_service = self.aws_client.s3_service
+        endswith = endswith if endswith else self.file_suffix
+        since, until = self.window
+        # Keys are pruned by their partition and name out of the time window,
+        # incremental runs resume listing from the last partitions processed.
+        layout = (
+            self.log_type.key_layout
+            if self.partitioned_listing or since or until or self.incremental
+            else None
+        )
+
+        if self.incremental:
+            source = f"s3://{bucket}"
+            yield from self.parse_checkpointed(
+                source,
+                s3_service.list_objects(
+                    bucket,
+                    prefix,
+                    endswith,
+                    self.regex_filter,
+                    layout,
+                    self.fetch_concurrency,
+                    since,
+                    until,
+                    partial(self.checkpoints.start_after, source) if layout else None,
+                ),
+                lambda file: s3_service.read_key(
+                    bucket,
+                    file["Key"],
+                    etag=file.get("ETag"),
+                    cache=self.cache,
+                    **self.file_options,
+                ),
+                partial(parse_keys_batch, bucket=bucket),
+                self.fetch_concurrency,
+                layout.partition if layout else None,
+            )
+            return
+
+        if self.workers > 1:
+            yield from self.parse_parallel(
+                partial(parse_keys_batch, bucket=bucket),
+                s3_service.list_objects(
+                    bucket,
+                    prefix,
+                    endswith,
+                    self.regex_filter,
+                    layout,
+                    self.fetch_concurrency,
+                    since,
+                    until,
+                ),
+            )
+            return
+
         yield from self.parse(
-            self.aws_client.s3_service.read_keys(
+            s3_service.read_keys(
                 bucket,
                 prefix,
-                endswith=endswith if endswith else self.file_suffix,
+                endswith=endswith,
                 regex_filter=self.regex_filter,
+                concurrency=self.fetch_concurrency,
+                ordered=self.fetch_ordered,
+                layout=layout,
+                since=since,
+                until=until,
+                cache=self.cache,
+                **self.file_options,
             )
         )
+        if self.cache and self.verbose:
+            print(f"Cache: {self.cache.stats}")
 
-    def read_url(self, url):
+    def read_url(self, url, fields=None, since=None, until=None, incremental=None):
         """
         Yield parsed log entries from the given url. The file:// and s3://
         schemes are currently supported.
@@ -166,11 +793,43 @@ class AwsLogParser:
                 s3://bucket/prefix/logfile.log
 
         :type kind: str
-        :raise ValueError: If the url schema is not known.
+        :param fields: Only decode these fields, overriding ``fields`` of the
+            parser. CSV log types only.
+        :type kind: list
+        :param since: Only yield the entries from this time on, overriding
+            ``since`` of the parser. Naive datetimes are in UTC.
+        :type kind: datetime.datetime
+        :param until: Only yield the entries before this time, overriding
+            ``until`` of the parser.
+        :type kind: datetime.datetime
+        :param incremental: Only yield the entries of the objects or files
+            that are new or changed since they were last processed, and
+            checkpoint them in the ``checkpoint_path`` store. Overrides
+            ``incremental`` of the parser.
+        :type kind: bool
+        :raise ValueError: If the url schema is not known, or an incremental
+            run has no checkpoint store.
         :return: Parsed log entries.
         :rtype: Dependant on log_type.
 
         """
+        overrides = {
+            name: value
+            for name, value in (
+                ("fields", fields),
+                ("since", since),
+                ("until", until),
+                ("incremental", incremental),
+            )
+            if value is not None
+        }
+        if overrides:
+            yield from self.overridden(**overrides).read_url(url)
+            return
+
+        if self.incremental and self.checkpoints is None:
+            raise ValueError("Incremental runs need a checkpoint_path")
+
         parsed = urlparse(url)
 
         if parsed.scheme == "file":
@@ -183,3 +842,75 @@ class AwsLogParser:
             )
         else:
             raise ValueError(f"Unknown scheme {parsed.scheme}")
+
+    def read_batches(self, url, resume_from=0):
+        """
+        Yield the parsed log entries of a single file or S3 object in
+        batches, each one with the ``FileOffset`` to resume reading after it
+        from. Record the offset once the entries of a batch are processed to
+        continue an interrupted run from there rather than from the start.
+        Plain files resume from a line, gzipped files from the start of the
+        member being read, skipping the lines of it already read. CSV log
+        types only.
+
+        :param url: The file:// or s3:// url of the file.
+        :type kind: str
+        :param resume_from: The ``FileOffset``, or byte offset, to resume
+            from. S3 objects are then read with a ranged GET.
+        :type kind: FileOffset
+        :raise ValueError: If the url schema is not known or the log type
+            is not CSV.
+        :return: Batches of parsed log entries and their offset.
+        :rtype: tuple
+        """
+        parsed = urlparse(url)
+        if parsed.scheme == "file":
+            batches = self.file_lines(
+                Path(parsed.path), resume_from=resume_from
+            ).batches()
+        elif parsed.scheme == "s3":
+            batches = self.aws_client.s3_service.read_key_batches(
+                parsed.netloc,
+                parsed.path.lstrip("/"),
+                cache=self.cache,
+                resume_from=resume_from,
+                **self.file_options,
+            )
+        else:
+            raise ValueError(f"Unknown scheme {parsed.scheme}")
+
+        for lines, offset in batches:
+            yield list(self.parse(lines)), offset
+
+    def read_columns(self, url, fields=None, batch_size=1024 * 64):
+        """
+        Yield batches of columns from the given url, each one a dict of
+        NumPy arrays keyed by field name. Numbers are typed arrays, timestamps
+        ``datetime64`` and the other fields ``DictionaryColumn``. Missing
+        numbers are masked. CSV log types only, requires numpy.
+
+        :param url: The url to read from, see ``read_url``.
+        :type kind: str
+        :param fields: Only decode these fields, defaults to ``fields`` of the
+            parser or all of them.
+        :type kind: list
+        :param batch_size: The number of rows per batch.
+        :type kind: int
+        :raise ValueError: If a field is unknown or the log type is not CSV.
+        :raise ImportError: If numpy is not installed.
+        :return: Column batches.
+        :rtype: dict
+        """
+        try:
+            from .columns import column_converters, to_columns
+        except ImportError as exc:
+            raise ImportError(
+                "read_columns requires numpy, install aws-log-parser[columns]"
+            ) from exc
+
+        if self.log_type.type != LogFormatType.CSV:
+            raise ValueError("Columns are only read from CSV log types")
+        converters = column_converters(self.log_type.model, fields or self.fields)
+        parser = self.overridden(record_type="raw", lazy=False, plugins_loaded=[])
+        for rows in batcher(parser.read_url(url), batch_size):
+            yield to_columns(converters, rows)
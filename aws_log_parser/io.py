@@ -1,9 +1,55 @@
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
+import codecs
 import io
-import gzip
+import json
+import mmap
+import os
+import re
 import typing
+import zlib
+
+# Decompress gzip framed data (header and trailer) with zlib.
+GZIP_WBITS = zlib.MAX_WBITS | 16
+
+DEFAULT_CHUNK_SIZE = 1024 * 256
+
+# Bounds the buffer of a JSON object spanning several chunks.
+MAX_JSON_OBJECT_SIZE = 1024 * 1024 * 16
+
+JSON_WHITESPACE = re.compile(r"\s*")
+
+# Files smaller than this aren't split into byte ranges.
+MIN_RANGE_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileOffset:
+    """
+    Where to resume reading a file: from byte ``offset``, skipping ``lines``
+    lines. Gzipped files resume from the start of a member, skipping the
+    lines of the member already read.
+    """
+
+    offset: int = 0
+    lines: int = 0
+
+
+def file_offset(value):
+    return value if isinstance(value, FileOffset) else FileOffset(value)
+
+
+def byte_ranges(size, parts, min_size=MIN_RANGE_SIZE):
+    """
+    Split ``size`` bytes into at most ``parts`` ``(start, end)`` ranges of at
+    least ``min_size`` bytes, to be read with ``FileIterator(mmap=True)``.
+    """
+    parts = min(parts, size // min_size)
+    if parts <= 1:
+        return [(0, size)]
+    step = -(-size // parts)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
 
 
 @dataclass
@@ -11,12 +57,147 @@ class FileIterator:
     path: typing.Optional[Path] = None
     fileobj: typing.Optional[io.IOBase] = None
     gzipped: bool = False
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    json_objects: bool = False
+    binary: bool = False
+    # Plain files, by path or open, are read from a memory map, lines starting
+    # in [start, end).
+    mmap: bool = False
+    start: int = 0
+    end: typing.Optional[int] = None
+    # A FileOffset, or byte offset, yielded by batches. An open file is read
+    # from its current position, which must be there unless it is mapped.
+    resume_from: typing.Union[FileOffset, int] = 0
+
+    def __post_init__(self):
+        if (self.start or self.end is not None) and not self.mapped_lines:
+            raise ValueError("Byte ranges need the lines of a memory mapped file")
+        self.resume_from = file_offset(self.resume_from)
+        if self.resumed and self.json_objects:
+            raise ValueError("Only files of lines can be resumed")
+
+    @property
+    def resumed(self):
+        return self.resume_from != FileOffset()
+
+    @property
+    def mapped_lines(self):
+        return (
+            self.mmap
+            and self.path is not None
+            and not (self.gzipped or self.json_objects)
+        )
+
+    def read_chunks(self, fh):
+        while data := fh.read(self.chunk_size):
+            yield data
+
+    def decompress(self, fh):
+        for chunk, _ in self.decompress_members(fh):
+            yield chunk
+
+    def decompress_members(self, fh):
+        """
+        Yield decompressed chunks of at most ``chunk_size`` bytes, with the
+        offset of the member they are part of. Multi-member gzip files are
+        decompressed member after member.
+        """
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        started = False
+        # The offset of the end of the data read so far.
+        read = self.resume_from.offset
+        member = read
+        for data in self.read_chunks(fh):
+            read += len(data)
+            while True:
+                if not started:
+                    # Members may be followed by zero padding.
+                    data = data.lstrip(b"\x00")
+                    if not data:
+                        break
+                    # The data left is always the end of the data read.
+                    member = read - len(data)
+                    started = True
+                chunk = decompressor.decompress(data, self.chunk_size)
+                if chunk:
+                    yield chunk, member
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                    decompressor = zlib.decompressobj(GZIP_WBITS)
+                    started = False
+                else:
+                    data = decompressor.unconsumed_tail
+                    # A full chunk may leave output buffered inside zlib.
+                    if not data and len(chunk) < self.chunk_size:
+                        break
+
+        if started:
+            raise EOFError(
+                "Compressed file ended before the end-of-stream marker was reached"
+            )
+
+    def yield_lines(self, chunks):
+        """
+        Split a stream of byte chunks into decoded lines, or lines of bytes
+        with ``binary``. Lines spanning chunk boundaries are carried over to
+        the next chunk.
+        """
+        pending = b""
+        for chunk in chunks:
+            data = pending + chunk
+            end = data.rfind(b"\n") + 1
+            if end:
+                yield from self.splitlines(data[:end])
+            pending = data[end:]
+
+        if pending:
+            yield from self.splitlines(pending)
+
+    def splitlines(self, data):
+        return data.splitlines() if self.binary else data.decode("utf-8").splitlines()
+
+    def yield_json(self, chunks):
+        """
+        Decode a stream of byte chunks holding JSON objects, one per line or
+        concatenated, and yield them as they complete. Only the incomplete
+        object at the end of a chunk is carried over.
+
+        :raise ValueError: If the stream is not valid JSON.
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        for chunk in chunks:
+            buffer += text_decoder.decode(chunk)
+            pos = 0
+            while True:
+                pos = JSON_WHITESPACE.match(buffer, pos).end()  # type: ignore
+                if pos == len(buffer):
+                    break
+                try:
+                    obj, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # Incomplete, wait for the next chunk.
+                    break
+                yield obj
+            buffer = buffer[pos:]
+            if len(buffer) > MAX_JSON_OBJECT_SIZE:
+                raise ValueError(
+                    f"JSON object larger than {MAX_JSON_OBJECT_SIZE} bytes"
+                )
+
+        buffer += text_decoder.decode(b"", final=True)
+        pos = JSON_WHITESPACE.match(buffer).end()  # type: ignore
+        while pos < len(buffer):
+            obj, pos = decoder.raw_decode(buffer, pos)
+            yield obj
+            pos = JSON_WHITESPACE.match(buffer, pos).end()  # type: ignore
 
     def yield_gzipped(self, fh):
-        yield from [line for line in fh.read().decode("utf-8").splitlines()]
+        yield from self.yield_lines(self.decompress(fh))
 
     def yield_plain(self, fh):
-        yield from [line.decode("utf-8") for line in fh]
+        yield from self.yield_lines(self.read_chunks(fh))
 
     @contextmanager
     def open_path(self):
@@ -28,19 +209,159 @@ class FileIterator:
             fh.close()
 
     @contextmanager
-    def open_gzip(self):
+    def open_file(self):
         if self.fileobj:
-            yield gzip.GzipFile(fileobj=self.fileobj)
-        else:
-            with self.open_path() as fh:
-                yield gzip.GzipFile(fileobj=fh)
+            # Closed by whoever opened it.
+            yield self.fileobj
+            return
+        with self.open_path() as fh:
+            yield fh
+
+    @contextmanager
+    def open_mapping(self, fh):
+        if not os.fstat(fh.fileno()).st_size:
+            # Empty files can't be mapped.
+            yield b""
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            yield mapping
+
+    def mapped_chunks(self, mapping):
+        for pos in range(0, len(mapping), self.chunk_size):
+            yield mapping[pos : pos + self.chunk_size]
+
+    def yield_mapped(self, mapping):
+        for lines, _ in self.mapped_batches(mapping):
+            yield from lines
+
+    def mapped_batches(self, mapping):
+        """
+        Yield the lines starting within ``start`` and ``end`` of a memory
+        mapped file, with the offset following them. The mapping is decoded
+        in windows of about ``chunk_size`` bytes cut after a newline, straight
+        from a memoryview without copying them into intermediate bytes.
+        """
+        size = len(mapping)
+
+        def boundary(offset):
+            # The start of the first line at or after offset.
+            if offset <= 0:
+                return 0
+            if offset >= size:
+                return size
+            newline = mapping.find(b"\n", offset - 1)
+            return size if newline == -1 else newline + 1
+
+        pos = boundary(max(self.start, self.resume_from.offset))
+        stop = boundary(size if self.end is None else self.end)
+        view = memoryview(mapping)
+        try:
+            while pos < stop:
+                cut = boundary(min(pos + self.chunk_size, stop))
+                if self.binary:
+                    yield mapping[pos:cut].splitlines(), FileOffset(cut)
+                else:
+                    yield str(view[pos:cut], "utf-8").splitlines(), FileOffset(cut)
+                pos = cut
+        finally:
+            view.release()
+
+    def plain_batches(self, fh):
+        pending = b""
+        # The offset of the pending data.
+        pos = self.resume_from.offset
+        for chunk in self.read_chunks(fh):
+            data = pending + chunk
+            end = data.rfind(b"\n") + 1
+            if end:
+                pos += end
+                yield self.splitlines(data[:end]), FileOffset(pos)
+            pending = data[end:]
+
+        if pending:
+            yield self.splitlines(pending), FileOffset(pos + len(pending))
+
+    def gzipped_batches(self, fh):
+        pending = b""
+        # Members can only be resumed from when they start a line.
+        offset = current = self.resume_from.offset
+        count = 0
+        for chunk, member in self.decompress_members(fh):
+            if member != current:
+                current = member
+                if not pending:
+                    offset = member
+                    count = 0
+            data = pending + chunk
+            end = data.rfind(b"\n") + 1
+            if end:
+                lines = self.splitlines(data[:end])
+                count += len(lines)
+                yield lines, FileOffset(offset, count)
+            pending = data[end:]
+
+        if pending:
+            lines = self.splitlines(pending)
+            yield lines, FileOffset(offset, count + len(lines))
+
+    @contextmanager
+    def open_resumed(self):
+        with self.open_file() as fh:
+            if not self.fileobj:
+                fh.seek(self.resume_from.offset)
+            yield fh
+
+    def batches(self):
+        """
+        Yield batches of lines with the ``FileOffset`` to resume reading after
+        them from, e.g. once their entries are stored.
+        """
+        if self.json_objects:
+            raise ValueError("Only files of lines can be resumed")
+
+        if self.mmap and not self.gzipped:
+            with self.open_file() as fh, self.open_mapping(fh) as mapping:
+                yield from self.mapped_batches(mapping)
+            return
+
+        skip = self.resume_from.lines
+        with self.open_resumed() as fh:
+            for lines, offset in (
+                self.gzipped_batches(fh) if self.gzipped else self.plain_batches(fh)
+            ):
+                if skip:
+                    skipped = min(skip, len(lines))
+                    lines = lines[skipped:]
+                    skip -= skipped
+                yield lines, offset
+
+    def yield_gzipped_json(self, fh):
+        yield from self.yield_json(self.decompress(fh))
+
+    def yield_plain_json(self, fh):
+        yield from self.yield_json(self.read_chunks(fh))
 
     def __iter__(self):
-        yield_func = self.yield_gzipped if self.gzipped else self.yield_plain
-        open_func = self.open_gzip if self.gzipped else self.open_path
+        if self.resumed:
+            for lines, _ in self.batches():
+                yield from lines
+            return
 
-        if not self.gzipped and self.fileobj:
+        if self.json_objects:
+            yield_func = (
+                self.yield_gzipped_json if self.gzipped else self.yield_plain_json
+            )
+        else:
+            yield_func = self.yield_gzipped if self.gzipped else self.yield_plain
+
+        if self.mmap and not self.gzipped:
+            with self.open_file() as fh, self.open_mapping(fh) as mapping:
+                if self.json_objects:
+                    yield from self.yield_json(self.mapped_chunks(mapping))
+                else:
+                    yield from self.yield_mapped(mapping)
+        elif self.fileobj:
             yield from yield_func(self.fileobj)
         else:
-            with open_func() as fh:
+            with self.open_path() as fh:
                 yield from yield_func(fh)
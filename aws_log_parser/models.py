@@ -1,12 +1,15 @@
 import datetime
+import functools
+import re
 import typing
+from collections import namedtuple
 from enum import (
     Enum,
     auto,
 )
 
 from dataclasses_json import DataClassJsonMixin, config, dataclass_json
-from dataclasses import dataclass, field
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
 from http import cookies
 
 
@@ -35,6 +38,21 @@ class HttpRequest:
     protocol: str
 
 
+@dataclass(frozen=True, slots=True)
+class SlottedHost:
+    ip: str
+    port: int
+
+
+@dataclass(frozen=True, slots=True)
+class SlottedHttpRequest:
+    method: str
+    url: str
+    path: str
+    query: dict
+    protocol: str
+
+
 class LoadBalancerErrorReason(Enum):
     AuthInvalidAWSALBAuthNonce = auto()
     AuthInvalidCookie = auto()
@@ -79,7 +97,11 @@ class LoadBalancerErrorReason(Enum):
 
 @dataclass(frozen=True)
 class LogEntry(DataClassJsonMixin):
-    pass
+    # Attributes set by plugins, reserved as slots on the slotted variants.
+    slotted_extras: typing.ClassVar[typing.Tuple[str, ...]] = (
+        "instance_id",
+        "instance_name",
+    )
 
 
 @dataclass(frozen=True)
@@ -139,14 +161,24 @@ class LoadBalancerLogEntry(LogEntry):
 
 @dataclass(frozen=True)
 class CloudFrontLogEntry(LogEntry):
+    slotted_extras: typing.ClassVar[typing.Tuple[str, ...]] = (
+        *LogEntry.slotted_extras,
+        "_timestamp",
+    )
+
     date: datetime.date
     time: datetime.time
 
     @property
     def timestamp(self):
-        return datetime.datetime.fromisoformat(
-            f"{self.date}T{self.time}",
-        ).replace(tzinfo=datetime.timezone.utc)
+        # Computed once per entry and stored past the frozen __setattr__.
+        timestamp = getattr(self, "_timestamp", None)
+        if timestamp is None:
+            timestamp = datetime.datetime.combine(
+                self.date, self.time, datetime.timezone.utc
+            )
+            object.__setattr__(self, "_timestamp", timestamp)
+        return timestamp
 
 
 @dataclass(frozen=True)
@@ -191,6 +223,63 @@ class CloudFrontRTMPDistributionLogEntry(CloudFrontLogEntry):
     user_agent: str
 
 
+# Begin slotted
+
+
+@functools.cache
+def slotted_model(model):
+    """
+    Return a ``__slots__`` variant of ``model`` with the same fields and
+    properties, but without the per-instance ``__dict__`` and the json mixin.
+    The names in ``model.slotted_extras`` are added as slots so plugins can
+    still set them.
+    """
+    field_names = {model_field.name for model_field in fields(model)}
+    namespace = {
+        "__slots__": tuple(
+            name for name in model.slotted_extras if name not in field_names
+        )
+    }
+    for klass in reversed(model.__mro__):
+        namespace.update(
+            (name, attr)
+            for name, attr in vars(klass).items()
+            if isinstance(attr, property)
+        )
+    base = type(f"{model.__name__}Slots", (), namespace)
+
+    slotted = make_dataclass(
+        f"Slotted{model.__name__}",
+        [
+            (
+                model_field.name,
+                model_field.type,
+                field(
+                    default=model_field.default,
+                    default_factory=model_field.default_factory,
+                    metadata=model_field.metadata,
+                ),
+            )
+            for model_field in fields(model)
+        ],
+        bases=(base,),
+        frozen=True,
+        slots=True,
+    )
+    base.__module__ = slotted.__module__ = __name__
+    return slotted
+
+
+SlottedClassicLoadBalancerLogEntry = slotted_model(ClassicLoadBalancerLogEntry)
+SlottedLoadBalancerLogEntry = slotted_model(LoadBalancerLogEntry)
+SlottedCloudFrontWebDistributionLogEntry = slotted_model(
+    CloudFrontWebDistributionLogEntry
+)
+SlottedCloudFrontRTMPDistributionLogEntry = slotted_model(
+    CloudFrontRTMPDistributionLogEntry
+)
+
+
 # Begin WAF
 
 
@@ -283,17 +372,180 @@ class WafLogEntry(LogEntry):
         return self.httpRequest.clientIp
 
 
+# Begin records
+
+
+@functools.cache
+def record_model(model):
+    """
+    Return a namedtuple with the fields of ``model`` in order. Records carry
+    the decoded values only, the model properties are not available.
+    """
+    model_fields = fields(model)
+    # namedtuple defaults apply to the trailing fields only.
+    defaults = []
+    for model_field in reversed(model_fields):
+        if model_field.default is MISSING:
+            break
+        defaults.insert(0, model_field.default)
+
+    record = namedtuple(
+        f"{model.__name__}Record",
+        [model_field.name for model_field in model_fields],
+        defaults=defaults,
+    )
+    record.__module__ = __name__
+    return record
+
+
+ClassicLoadBalancerLogEntryRecord = record_model(ClassicLoadBalancerLogEntry)
+LoadBalancerLogEntryRecord = record_model(LoadBalancerLogEntry)
+CloudFrontWebDistributionLogEntryRecord = record_model(
+    CloudFrontWebDistributionLogEntry
+)
+CloudFrontRTMPDistributionLogEntryRecord = record_model(
+    CloudFrontRTMPDistributionLogEntry
+)
+WafLogEntryRecord = record_model(WafLogEntry)
+SlottedWafLogEntry = slotted_model(WafLogEntry)
+
+
 class LogFormatType(str, Enum):
     CSV = "CSV"
     JSON = "JSON"
 
 
+@dataclass(frozen=True)
+class KeyLayout:
+    """
+    The date partitions of the S3 keys of a log type. ``levels`` lead from
+    the log prefix down to a daily partition, each one a pattern matching the
+    key prefixes at that level and the delimiter listing them.
+
+    ``key_time`` captures the UTC time in the name of a key, parsed with
+    ``key_time_format``. The logs of a key are within ``key_time_span``
+    before and after that time.
+    """
+
+    levels: typing.Tuple[typing.Tuple[str, str], ...]
+    key_time: typing.Optional[str] = None
+    key_time_format: str = ""
+    key_time_span: typing.Tuple[datetime.timedelta, datetime.timedelta] = (
+        datetime.timedelta(0),
+        datetime.timedelta(0),
+    )
+
+    def key_window(self, key):
+        """
+        Return the ``(start, end)`` time range of the logs of ``key``, None
+        when its name holds no time.
+        """
+        match = re.search(self.key_time, key) if self.key_time else None
+        if match is None:
+            return None
+        time = datetime.datetime.strptime(match.group(1), self.key_time_format).replace(
+            tzinfo=datetime.timezone.utc
+        )
+        before, after = self.key_time_span
+        return time - before, time + after
+
+    def partition(self, key):
+        """
+        Return the daily partition prefix of ``key``, None when it isn't in
+        one.
+        """
+        match = re.match(self.levels[-1][0], key)
+        return match.group(0) if match else None
+
+    def prefix_window(self, match):
+        """
+        Return the ``(start, end)`` time range of the logs under the key
+        prefix matched by a level pattern, None above the year level.
+        """
+        dates = {
+            name: int(value)
+            for name, value in match.groupdict().items()
+            if value is not None
+        }
+        if "year" not in dates:
+            return None
+        start = datetime.datetime(
+            dates["year"],
+            dates.get("month", 1),
+            dates.get("day", 1),
+            tzinfo=datetime.timezone.utc,
+        )
+        if "day" in dates:
+            end = start + datetime.timedelta(days=1)
+        elif "month" in dates:
+            end = (start + datetime.timedelta(days=31)).replace(day=1)
+        else:
+            end = start.replace(year=start.year + 1)
+        before, after = self.key_time_span
+        return start - before, end + after
+
+
+def key_layout(*segments, **kwargs):
+    """
+    Build a ``KeyLayout`` from the ``(pattern, delimiter)`` segments of the
+    key prefixes, a level per segment.
+    """
+    levels = []
+    pattern = ""
+    for segment, delimiter in segments:
+        pattern += segment
+        levels.append((pattern, delimiter))
+    return KeyLayout(levels=tuple(levels), **kwargs)
+
+
+DATE_SEGMENTS = (r"(?P<year>\d{4})", r"(?P<month>\d{2})", r"(?P<day>\d{2})")
+
+# AWSLogs/<account>/elasticloadbalancing/<region>/YYYY/MM/DD/
+# <account>_elasticloadbalancing_<region>_<lb>_YYYYMMDDTHHMMZ_<ip>_<id>.log.gz
+# The time is the end of the 5 or 60 minutes interval of the key.
+ELB_KEY_LAYOUT = key_layout(
+    (".*elasticloadbalancing/[^/]+/", "/"),
+    *[(f"{segment}/", "/") for segment in DATE_SEGMENTS],
+    key_time=r"_(\d{8}T\d{4})Z_",
+    key_time_format="%Y%m%dT%H%M",
+    key_time_span=(datetime.timedelta(minutes=65), datetime.timedelta(minutes=5)),
+)
+
+# <distribution>.YYYY-MM-DD-HH.<id>.gz
+# Late requests can be delivered in the keys of the next hour.
+CLOUDFRONT_KEY_LAYOUT = key_layout(
+    (r"(?:.*/)?[^/.]+\.", "."),
+    *[(f"{segment}-", "-") for segment in DATE_SEGMENTS],
+    key_time=r"\.(\d{4}-\d{2}-\d{2}-\d{2})\.",
+    key_time_format="%Y-%m-%d-%H",
+    key_time_span=(datetime.timedelta(hours=1), datetime.timedelta(hours=1)),
+)
+
+# AWSLogs/<account>/WAFLogs/<region>/<web acl>/YYYY/MM/DD/
+# <account>_waflogs_<region>_<web acl>_YYYYMMDDTHHMMZ_<id>.log.gz
+WAF_KEY_LAYOUT = key_layout(
+    (".*WAFLogs/[^/]+/[^/]+/", "/"),
+    *[(f"{segment}/", "/") for segment in DATE_SEGMENTS],
+    key_time=r"_(\d{8}T\d{4})Z_",
+    key_time_format="%Y%m%dT%H%M",
+    key_time_span=(datetime.timedelta(minutes=10), datetime.timedelta(minutes=5)),
+)
+
+
 @dataclass
 class LogFormat:
     name: str
     model: typing.Type[LogEntry]
     type: LogFormatType
     delimiter: typing.Optional[str] = None
+    # Low cardinality string fields deduplicated while parsing.
+    interned: typing.Tuple[str, ...] = ()
+    intern_size: int = 4096
+    # Fields written in double quotes, for the grammar of the elb tokenizer.
+    quoted: typing.Tuple[str, ...] = ()
+    key_layout: typing.Optional[KeyLayout] = None
+    # The fields holding the time of an entry, a date and a time or a datetime.
+    timestamp_fields: typing.Tuple[str, ...] = ("timestamp",)
 
 
 def LogFormatCsv(**kwargs):
@@ -317,24 +569,75 @@ class LogType:
     ClassicLoadBalancer: typing.ClassVar[LogFormat] = LogFormatCsvSpaced(
         name="ClassicLoadBalancer",
         model=ClassicLoadBalancerLogEntry,
+        interned=(
+            "elb",
+            "user_agent",
+            "ssl_cipher",
+            "ssl_protocol",
+        ),
+        quoted=("http_request", "user_agent"),
+        key_layout=ELB_KEY_LAYOUT,
     )
 
     LoadBalancer: typing.ClassVar[LogFormat] = LogFormatCsvSpaced(
         name="LoadBalancer",
         model=LoadBalancerLogEntry,
+        interned=(
+            "elb",
+            "user_agent",
+            "ssl_cipher",
+            "ssl_protocol",
+            "target_group_arn",
+            "domain_name",
+            "chosen_cert_arn",
+        ),
+        quoted=(
+            "http_request",
+            "user_agent",
+            "trace_id",
+            "domain_name",
+            "chosen_cert_arn",
+            "actions_executed",
+            "redirect_url",
+            "error_reason",
+        ),
+        key_layout=ELB_KEY_LAYOUT,
     )
 
     CloudFront: typing.ClassVar[LogFormat] = LogFormatCsvTabbed(
         name="CloudFront",
         model=CloudFrontWebDistributionLogEntry,
+        interned=(
+            "edge_location",
+            "http_method",
+            "host",
+            "user_agent",
+            "edge_result_type",
+            "host_header",
+            "protocol",
+            "ssl_protocol",
+            "ssl_cipher",
+            "edge_response_result_type",
+            "protocol_version",
+        ),
+        key_layout=CLOUDFRONT_KEY_LAYOUT,
+        timestamp_fields=("date", "time"),
     )
 
     CloudFrontRTMP: typing.ClassVar[LogFormat] = LogFormatCsvTabbed(
         name="CloudFrontRTMP",
         model=CloudFrontRTMPDistributionLogEntry,
+        interned=(
+            "edge_location",
+            "event",
+            "user_agent",
+        ),
+        key_layout=CLOUDFRONT_KEY_LAYOUT,
+        timestamp_fields=("date", "time"),
     )
 
     WAF: typing.ClassVar[LogFormat] = LogFormatJson(
         name="WAF",
         model=WafLogEntry,
+        key_layout=WAF_KEY_LAYOUT,
     )
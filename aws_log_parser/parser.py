@@ -1,8 +1,13 @@
 import datetime
+import functools
+import json
 import logging
+import operator
+import sys
 import typing
 import urllib.parse
 
+from dataclasses import MISSING, fields, is_dataclass
 from http import cookies
 
 from .exceptions import UnknownHttpType
@@ -11,6 +16,8 @@ from .models import (
     Host,
     HttpRequest,
     LoadBalancerErrorReason,
+    SlottedHost,
+    SlottedHttpRequest,
 )
 
 logger = logging.getLogger(__name__)
@@ -23,18 +30,54 @@ def to_http_type(value):
     raise UnknownHttpType(value)
 
 
+# Since Python 3.11 fromisoformat parses the trailing "Z" of AWS timestamps.
+FROMISOFORMAT_Z = sys.version_info >= (3, 11)
+
+MINUTE_CACHE_SIZE = 4096
+
+minute_cache = {}
+
+
+def to_datetime_fixed(value):
+    """
+    Decode the fixed ``YYYY-MM-DDTHH:MM:SS.ffffffZ`` layout of the load
+    balancer logs. The date, hour and minute prefix is parsed once and cached,
+    only the seconds are parsed per value.
+    """
+    prefix = value[:16]
+    minute = minute_cache.get(prefix)
+    if minute is None:
+        if len(minute_cache) >= MINUTE_CACHE_SIZE:
+            minute_cache.clear()
+        minute = minute_cache[prefix] = (
+            int(prefix[0:4]),
+            int(prefix[5:7]),
+            int(prefix[8:10]),
+            int(prefix[11:13]),
+            int(prefix[14:16]),
+        )
+    return datetime.datetime(
+        *minute, int(value[17:19]), int(value[20:26]), datetime.timezone.utc
+    )
+
+
 def to_datetime(value):
+    if value[-1:] == "Z":
+        if FROMISOFORMAT_Z:
+            return datetime.datetime.fromisoformat(value)
+        if len(value) == 27:
+            return to_datetime_fixed(value)
     return datetime.datetime.fromisoformat(value.rstrip("Z")).replace(
         tzinfo=datetime.timezone.utc
     )
 
 
-def to_http_request(value):
+def to_http_request(value, http_request=HttpRequest):
     # The url can contain spaces
     split = value.split()
     url = " ".join(split[1:-1])
     parsed = urllib.parse.urlparse(url)
-    return HttpRequest(
+    return http_request(
         split[0],
         url,
         parsed.path,
@@ -49,16 +92,159 @@ def to_cookie(value):
     return {urllib.parse.unquote(key): morsel.value for key, morsel in cookie.items()}
 
 
-def to_python(value, field):
-    value = value.strip('"')
+def to_host(value, host=Host):
+    ip, port = value.split(":")
+    return host(ip, int(port))
 
+
+def to_error_reason(value):
+    return getattr(LoadBalancerErrorReason, value)
+
+
+def to_list(value):
+    return value.split(",")
+
+
+def field_type_of(field):
     origin = typing.get_origin(field.type)
-    field_type = (
+    return (
         typing.get_args(field.type)[0]  # XXX: only supports Optional types
         if origin == typing.Union
         else field.type
     )
 
+
+def required(func, quoted=True):
+    if not quoted:
+        return func
+
+    def convert(value):
+        return func(value.strip('"'))
+
+    return convert
+
+
+def nullable(func, quoted=True):
+    def convert(value):
+        value = value.strip('"')
+        if value == "-":
+            return None
+        return func(value)
+
+    def convert_unquoted(value):
+        return None if value == "-" else func(value)
+
+    return convert if quoted else convert_unquoted
+
+
+def nullable_str(value):
+    value = value.strip('"')
+    if value == "-":
+        return None
+    return value
+
+
+def nullable_unquoted_str(value):
+    return None if value == "-" else value
+
+
+# Converters of composite fields whose values repeat heavily across rows.
+MEMOIZABLE = {
+    "host": to_host,
+    "http_request": to_http_request,
+    "cookie": to_cookie,
+    "unquote": urllib.parse.unquote,
+}
+
+# Build the slotted Host and HttpRequest variants for the slotted models.
+SLOTTED_FUNCS = {
+    **MEMOIZABLE,
+    "host": functools.partial(to_host, host=SlottedHost),
+    "http_request": functools.partial(to_http_request, http_request=SlottedHttpRequest),
+}
+
+
+def memoized_funcs(maxsize, funcs=MEMOIZABLE):
+    """
+    Return LRU cached versions of the ``funcs`` converters. The cached values
+    are shared between entries; ``HttpRequest`` and ``Host`` are frozen but the
+    ``query`` and cookie dicts must not be mutated.
+    """
+    return {
+        name: functools.lru_cache(maxsize=maxsize)(func) for name, func in funcs.items()
+    }
+
+
+def to_converter(field, funcs=MEMOIZABLE, quoted=True):
+    """
+    Return the callable that decodes a raw column into the value for ``field``.
+    Mirrors the rules of ``to_python`` but resolves them once per field.
+    Without ``quoted`` the columns are known to be unquoted already.
+    """
+    field_type = field_type_of(field)
+
+    if field_type is datetime.datetime:
+        return required(to_datetime, quoted)
+    if field_type == datetime.date:
+        return required(datetime.date.fromisoformat, quoted)
+    if field_type == datetime.time:
+        return required(datetime.time.fromisoformat, quoted)
+    if field_type == typing.List[str]:
+        return required(to_list, quoted)
+    if field_type == LoadBalancerErrorReason:
+        return nullable(to_error_reason, quoted)
+    if field_type == Host:
+        return nullable(funcs["host"], quoted)
+    if field_type == HttpRequest:
+        return nullable(funcs["http_request"], quoted)
+    if field_type == HttpType:
+        return nullable(to_http_type, quoted)
+    if field.name == "user_agent":
+        return nullable(funcs["unquote"], quoted)
+    if field.name == "uri_query":
+        return nullable(urllib.parse.parse_qs, quoted)
+    if field.name == "cookie":
+        return nullable(funcs["cookie"], quoted)
+    if field_type is str:
+        return nullable_str if quoted else nullable_unquoted_str
+    return nullable(field_type, quoted)
+
+
+def model_converters(model, funcs=None, quoted=True):
+    """
+    Return a tuple with one converter per field of ``model`` in column order.
+    Without ``funcs`` the result is computed once per model and reused.
+    """
+    if funcs is None:
+        return default_converters(model, quoted)
+    return tuple(to_converter(field, funcs, quoted) for field in fields(model))
+
+
+@functools.cache
+def default_converters(model, quoted=True):
+    return tuple(to_converter(field, quoted=quoted) for field in fields(model))
+
+
+def projected_converters(model, names, converters=None):
+    """
+    Like ``model_converters`` but with ``None`` in place of the converter of
+    every field not in ``names``, so those columns are skipped.
+    """
+    field_names = [field.name for field in fields(model)]
+    unknown = set(names) - set(field_names)
+    if unknown:
+        raise ValueError(f"Unknown fields for {model.__name__}: {sorted(unknown)}")
+    return tuple(
+        converter if name in names else None
+        for converter, name in zip(converters or model_converters(model), field_names)
+    )
+
+
+def to_python(value, field):
+    value = value.strip('"')
+
+    field_type = field_type_of(field)
+
     if field_type is datetime.datetime:
         return to_datetime(value)
     if field_type == datetime.date:
@@ -70,10 +256,9 @@ def to_python(value, field):
     if value == "-":
         return None
     if field_type == LoadBalancerErrorReason:
-        return getattr(LoadBalancerErrorReason, value)
+        return to_error_reason(value)
     if field_type == Host:
-        ip, port = value.split(":")
-        return Host(ip, int(port))
+        return to_host(value)
     if field_type == HttpRequest:
         return to_http_request(value)
     if field_type == HttpType:
@@ -85,3 +270,343 @@ def to_python(value, field):
     if field.name == "cookie":
         return to_cookie(value)
     return field_type(value)
+
+
+def nullable_bytes(func):
+    def convert(value):
+        return None if value == b"-" else func(value)
+
+    return convert
+
+
+def to_bytes_converter(field, converter):
+    """
+    Adapt ``converter`` to columns left as bytes by the tokenizer. Numbers are
+    parsed from the bytes, other columns are decoded first.
+    """
+    if converter is None:
+        return None
+    field_type = field_type_of(field)
+    if field_type is int or field_type is float:
+        return nullable_bytes(field_type)
+    return lambda value: converter(value.decode("utf-8"))
+
+
+def bytes_converters(model, converters):
+    return tuple(
+        to_bytes_converter(model_field, converter)
+        for model_field, converter in zip(fields(model), converters)
+    )
+
+
+class InternPool:
+    """
+    Bounded pool deduplicating the values of a column. Once ``size`` distinct
+    values are pooled new values are passed through as is.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = {}
+
+    def wrap(self, converter):
+        values = self.values
+        size = self.size
+
+        def convert(value):
+            value = converter(value)
+            interned = values.get(value)
+            if interned is None:
+                if value is None or len(values) >= size:
+                    return value
+                interned = values[value] = value
+            return interned
+
+        return convert
+
+
+def interned_converters(model, converters, pools):
+    """
+    Return ``converters`` with the converters of the fields in ``pools``
+    wrapped by their ``InternPool``.
+    """
+    return tuple(
+        pools[field.name].wrap(converter)
+        if converter and field.name in pools
+        else converter
+        for field, converter in zip(fields(model), converters)
+    )
+
+
+class LazyField:
+    """
+    Non-data descriptor that converts a column of the raw row on first access
+    and stores the value on the instance, shadowing the descriptor afterwards.
+    """
+
+    def __init__(self, field, index, converter):
+        self.name = field.name
+        self.index = index
+        self.converter = converter
+        if field.default is not MISSING:
+            self.default = lambda: field.default
+        elif field.default_factory is not MISSING:
+            self.default = field.default_factory
+        else:
+            self.default = lambda: None
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # Entries built by ``__init__``, ``dataclasses.replace``, have no row.
+        row = instance.__dict__.get("_raw_row", ())
+        value = (
+            self.converter(row[self.index]) if self.index < len(row) else self.default()
+        )
+        instance.__dict__[self.name] = value
+        return value
+
+
+def lazy_entry(model, row, state=None):
+    entry = lazy_model(model).from_row(row)
+    if state:
+        entry.__dict__.update(state)
+    return entry
+
+
+@functools.cache
+def lazy_model(model):
+    """
+    Return a subclass of ``model`` whose ``from_row`` builds entries from a
+    raw row, decoding their fields on first access. Entries keep the
+    dataclass ``__init__`` for ``dataclasses.replace`` and compare equal to
+    the ``model`` entries with the same values.
+    """
+    names = tuple(field.name for field in fields(model) if field.compare)
+
+    @classmethod
+    def from_row(cls, row):
+        entry = object.__new__(cls)
+        entry.__dict__["_raw_row"] = row
+        return entry
+
+    def __eq__(self, other):
+        if not isinstance(other, model):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in names)
+
+    def __reduce__(self):
+        state = self.__dict__.copy()
+        return lazy_entry, (model, state.pop("_raw_row", ()), state)
+
+    namespace = {
+        field.name: LazyField(field, index, converter)
+        for index, (field, converter) in enumerate(
+            zip(fields(model), model_converters(model))
+        )
+    }
+    namespace.update(
+        __module__=__name__,
+        __qualname__=f"Lazy{model.__qualname__}",
+        from_row=from_row,
+        __eq__=__eq__,
+        __hash__=model.__hash__,
+        __reduce__=__reduce__,
+    )
+    return type(f"Lazy{model.__name__}", (model,), namespace)
+
+
+FILTER_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, operand: value in operand,
+    "not in": lambda value, operand: value not in operand,
+}
+
+ORDERING_OPERATORS = ("<", "<=", ">", ">=")
+
+
+def to_utc(value):
+    # Naive datetimes are in UTC like the logs.
+    if not isinstance(value, datetime.datetime) or value.tzinfo:
+        return value
+    return value.replace(tzinfo=datetime.timezone.utc)
+
+
+def to_predicate(op, operand):
+    try:
+        func = FILTER_OPERATORS[op]
+    except KeyError:
+        raise ValueError(f"Unknown filter operator {op}")
+
+    if isinstance(operand, (list, tuple, set, frozenset)):
+        operand = type(operand)(to_utc(value) for value in operand)
+    else:
+        operand = to_utc(operand)
+
+    if op in ORDERING_OPERATORS:
+        # Missing values never satisfy a range.
+        return lambda value: value is not None and func(value, operand)
+    return lambda value: func(value, operand)
+
+
+def compile_filters(model, filters, converters=None):
+    """
+    Compile ``(field, operator, value)`` filters for ``model`` into
+    ``(index, converter, predicate)`` tuples evaluated on raw rows.
+    """
+    field_names = [field.name for field in fields(model)]
+    converters = converters or model_converters(model)
+    compiled = []
+    for name, op, operand in filters:
+        if name not in field_names:
+            raise ValueError(f"Unknown field for {model.__name__}: {name}")
+        index = field_names.index(name)
+        compiled.append((index, converters[index], to_predicate(op, operand)))
+    return tuple(compiled)
+
+
+def row_matches(compiled_filters, row):
+    """
+    Return True if the raw ``row`` satisfies every compiled filter. Only the
+    filtered columns are converted.
+    """
+    for index, converter, predicate in compiled_filters:
+        if not predicate(converter(row[index]) if index < len(row) else None):
+            return False
+    return True
+
+
+def to_timestamp(value, time=None):
+    # The CloudFront logs have a date and a time column.
+    if time is None:
+        return value
+    return datetime.datetime.combine(value, time, datetime.timezone.utc)
+
+
+def in_window(timestamp, since=None, until=None):
+    return (since is None or timestamp >= since) and (
+        until is None or timestamp < until
+    )
+
+
+def compile_window(model, names, converters=None):
+    """
+    Compile the ``names`` fields holding the time of a ``model`` entry, a
+    datetime or a date and a time, into ``(index, converter)`` tuples.
+    """
+    field_names = [field.name for field in fields(model)]
+    converters = converters or model_converters(model)
+    indexes = [field_names.index(name) for name in names]
+    return tuple((index, converters[index]) for index in indexes)
+
+
+def row_in_window(compiled_window, row, since=None, until=None):
+    """
+    Return True if the time of the raw ``row`` is within ``since`` included
+    and ``until`` excluded.
+    """
+    timestamp = to_timestamp(
+        *[converter(row[index]) for index, converter in compiled_window]
+    )
+    return in_window(timestamp, since, until)
+
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+
+def coerce(field_type):
+    """
+    Return a converter casting JSON values to ``field_type`` like
+    dataclasses_json does.
+    """
+
+    def convert(value):
+        return value if isinstance(value, field_type) else field_type(value)
+
+    return convert
+
+
+def to_json_decoder(field_type):
+    """
+    Return the callable that decodes a JSON value into ``field_type`` or None
+    when the value is used as is. None values are never decoded.
+    """
+    if is_dataclass(field_type):
+        return json_decoder(field_type)
+    if typing.get_origin(field_type) is typing.Union:
+        args = [arg for arg in typing.get_args(field_type) if arg is not type(None)]
+        return to_json_decoder(args[0]) if len(args) == 1 else None
+    if typing.get_origin(field_type) is list:
+        (item_type,) = typing.get_args(field_type)
+        decode_item = to_json_decoder(item_type)
+        if decode_item is None:
+            return None
+        return lambda values: [
+            None if value is None else decode_item(value) for value in values
+        ]
+    if field_type in (int, float, str, bool):
+        return coerce(field_type)
+    return None
+
+
+def to_json_field_decoder(field):
+    decoder = field.metadata.get("dataclasses_json", {}).get("decoder")
+    if decoder is None:
+        return to_json_decoder(field.type)
+    # Values already of the field type are kept, as by dataclasses_json.
+    return lambda value: value if type(value) is field.type else decoder(value)
+
+
+@functools.cache
+def json_decoder(model):
+    """
+    Return a callable building ``model`` from a decoded JSON object. The field
+    decoders are resolved once per model instead of on every record, the
+    result matches ``model.from_dict``.
+
+    :raise KeyError: From the callable, if a field without default is missing.
+    """
+    decoders = [
+        (
+            model_field.name,
+            to_json_field_decoder(model_field),
+            model_field
+            if model_field.default is not MISSING
+            or model_field.default_factory is not MISSING
+            else None,
+        )
+        for model_field in fields(model)
+    ]
+
+    def decode(obj):
+        values = []
+        for name, decoder, default_field in decoders:
+            if default_field is not None and name not in obj:
+                values.append(
+                    default_field.default
+                    if default_field.default is not MISSING
+                    else default_field.default_factory()
+                )
+                continue
+            value = obj[name]
+            values.append(value if value is None or decoder is None else decoder(value))
+        return model(*values)
+
+    return decode
+
+
+def from_json(model, record):
+    """
+    Decode a JSON ``record``, str or bytes, into ``model``.
+    """
+    return json_decoder(model)(json_loads(record))
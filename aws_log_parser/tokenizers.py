@@ -0,0 +1,100 @@
+import csv
+import dataclasses
+import functools
+import re
+
+
+def split_bytes_slow(line, delimiter):
+    # Escaped quotes, empty quoted columns and quotes within columns.
+    row = next(csv.reader([line.decode("utf-8")], delimiter=delimiter.decode()))
+    return [value.encode("utf-8") for value in row]
+
+
+def split_bytes(line, delimiter, limit=None, size=0):
+    """
+    Split a log line into its columns like ``csv.reader`` does, without
+    decoding it. Quoted columns are returned without their quotes.
+
+    With ``limit`` only the first ``limit`` columns are needed and the rest
+    of the line is left unsplit when they all precede the first quote. The
+    row is then padded with "-" up to ``size`` columns.
+    """
+    quote = line.find(b'"')
+    if quote == -1:
+        return line.split(delimiter)
+    if b'""' in line or (quote and line[quote - 1 : quote] != delimiter):
+        return split_bytes_slow(line, delimiter)
+
+    # The columns before the first quote, the last one is empty.
+    columns = line[:quote].split(delimiter)
+    columns.pop()
+    if limit is not None and len(columns) >= limit:
+        return columns + [b"-"] * (size - len(columns))
+    # Take out the quoted columns, mark their place with a quote and split.
+    parts = line[quote:].split(b'"')
+    if not len(parts) % 2:
+        return split_bytes_slow(line, delimiter)
+    quoted = iter(parts[1::2])
+    columns += [
+        next(quoted) if column == b'"' else column
+        for column in b'"'.join(parts[0::2]).split(delimiter)
+    ]
+    return columns
+
+
+def tokenize_bytes(lines, delimiter, limit=None, size=0):
+    """
+    Yield the columns of ``lines``, bytes or str, as bytes. Empty and comment
+    lines are skipped. ``limit`` and ``size`` are passed to ``split_bytes``.
+    """
+    delimiter = delimiter.encode()
+    for line in lines:
+        if isinstance(line, str):
+            line = line.encode("utf-8")
+        if line and not line.startswith(b"#"):
+            yield split_bytes(line, delimiter, limit, size)
+
+
+UNQUOTED_COLUMN = r'([^ "]*)'
+QUOTED_COLUMN = r'"([^"]*)"'
+
+
+@functools.cache
+def elb_pattern(model, quoted, limit=None):
+    """
+    Compile the grammar of the load balancer logs for ``model``: one column
+    per field, space separated, the ``quoted`` fields in double quotes. Fields
+    with a default, set by plugins, aren't logged. The columns past the first
+    ``limit`` fields, and those newer versions append after the model fields,
+    are left unmatched.
+    """
+    logged = [
+        model_field
+        for model_field in dataclasses.fields(model)
+        if model_field.default is dataclasses.MISSING
+        and model_field.default_factory is dataclasses.MISSING
+    ]
+    columns = [
+        QUOTED_COLUMN if model_field.name in quoted else UNQUOTED_COLUMN
+        for model_field in logged[:limit]
+    ]
+    return re.compile(" ".join(columns) + "(?: |$)")
+
+
+def tokenize_elb(lines, pattern, size=0):
+    """
+    Yield the unquoted columns of the load balancer log ``lines`` matched by
+    ``pattern``, padded with "-" up to ``size`` columns. Lines that don't
+    match, e.g. with escaped quotes or missing fields, are split by
+    ``csv.reader``.
+    """
+    match = pattern.match
+    padding = ("-",) * (size - pattern.groups)
+    for line in lines:
+        if not line or line.startswith("#"):
+            continue
+        matched = match(line)
+        if matched:
+            yield matched.groups() + padding
+        else:
+            yield next(csv.reader([line], delimiter=" "))
@@ -1,3 +1,5 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from itertools import islice
 
 
@@ -5,3 +7,46 @@ def batcher(iterable, batch_size):
     iterator = iter(iterable)
     while batch := list(islice(iterator, batch_size)):
         yield batch
+
+
+def prefetch(
+    func,
+    iterable,
+    concurrency,
+    ordered=True,
+    queue_size=None,
+    executor_class=ThreadPoolExecutor,
+    initializer=None,
+    initargs=(),
+):
+    """
+    Yield ``func(item)`` for every item, running up to ``concurrency`` calls in
+    a thread pool (or ``executor_class``). At most ``queue_size`` (default
+    ``2 * concurrency``) calls are submitted ahead of the consumer.
+
+    :param ordered: Yield results in input order, otherwise in completion order.
+    :param initializer: Called with ``initargs`` once in every worker.
+    """
+    iterator = iter(iterable)
+    executor = executor_class(
+        max_workers=concurrency, initializer=initializer, initargs=initargs
+    )
+    pending = deque()
+
+    def submit(count):
+        for item in islice(iterator, count):
+            pending.append(executor.submit(func, item))
+
+    try:
+        submit(queue_size or concurrency * 2)
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                future = wait(pending, return_when=FIRST_COMPLETED).done.pop()
+                pending.remove(future)
+            result = future.result()
+            submit(1)
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
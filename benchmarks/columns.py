@@ -0,0 +1,54 @@
+"""
+p99 target processing time and byte totals over LoadBalancer logs, from
+parsed entries and from ``read_columns`` batches.
+
+    python -m benchmarks.columns [rows]
+"""
+
+import statistics
+import sys
+import tempfile
+
+from pathlib import Path
+
+import numpy as np
+
+from .common import report, sample_lines, timed
+
+from aws_log_parser import AwsLogParser, LogType
+
+
+def from_entries(parser, url):
+    times, sent_bytes = [], 0
+    for entry in parser.read_url(url):
+        times.append(entry.target_processing_time)
+        sent_bytes += entry.sent_bytes
+    return statistics.quantiles(times, n=100)[-1], sent_bytes
+
+
+def from_columns(parser, url):
+    batches = list(
+        parser.read_columns(url, fields=["target_processing_time", "sent_bytes"])
+    )
+    times = np.concatenate([batch["target_processing_time"] for batch in batches])
+    sent_bytes = sum(int(batch["sent_bytes"].sum()) for batch in batches)
+    return np.percentile(times, 99, method="weibull"), sent_bytes
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "alb.log"
+        path.write_text("\n".join(sample_lines("LoadBalancer", rows)) + "\n")
+        parser = AwsLogParser(LogType.LoadBalancer)
+        url = f"file://{path}"
+        before, elapsed = timed(from_entries, parser, url)
+        report("entries", rows, elapsed)
+        after, elapsed = timed(from_columns, parser, url)
+        report("read_columns", rows, elapsed)
+        assert before[1] == after[1]
+        print(f"p99 {before[0]:.4f} / {after[0]:.4f}  sent_bytes {after[1]:,}")
+
+
+if __name__ == "__main__":
+    main()
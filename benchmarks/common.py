@@ -0,0 +1,40 @@
+import time
+
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parents[1] / "test" / "data"
+
+SAMPLES = {
+    "ClassicLoadBalancer": ["classic_loadbalancer_http_entry.csv"],
+    "LoadBalancer": [
+        "loadbalancer_http_entry.csv",
+        "loadbalancer_https_entry.csv",
+        "loadbalancer_http2_entry.csv",
+        "loadbalancer_cloudfront_forward.csv",
+        "loadbalancer_lambda_failed_entry.csv",
+    ],
+    "CloudFront": [
+        "cloudfront_entry.csv",
+        "cloudfront_entry2.csv",
+        "cloudfront_entry_cookie_with_encoding.csv",
+    ],
+}
+
+
+def sample_lines(log_type_name, count):
+    """
+    Return ``count`` log lines for the log type by cycling over the test
+    fixtures.
+    """
+    lines = [(DATA_DIR / name).read_text().strip() for name in SAMPLES[log_type_name]]
+    return [lines[i % len(lines)] for i in range(count)]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(label, rows, elapsed):
+    print(f"{label:<40} {rows / elapsed:>12,.0f} rows/s  ({elapsed:.3f}s)")
@@ -0,0 +1,55 @@
+"""
+Peak memory of iterating a gzipped log with ``FileIterator`` compared to
+decompressing the whole object up front.
+
+    python -m benchmarks.gzip_memory [rows]
+"""
+
+import gzip
+import sys
+import tracemalloc
+
+from io import BytesIO
+
+from .common import sample_lines, timed
+
+from aws_log_parser.io import FileIterator
+
+
+def read_whole(data):
+    lines = gzip.GzipFile(fileobj=BytesIO(data)).read().decode("utf-8").splitlines()
+    for _ in lines:
+        pass
+
+
+def read_streaming(data, chunk_size):
+    for _ in FileIterator(fileobj=BytesIO(data), gzipped=True, chunk_size=chunk_size):
+        pass
+
+
+def peak(func, *args):
+    tracemalloc.start()
+    _, elapsed = timed(func, *args)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    raw = "\n".join(sample_lines("LoadBalancer", rows)).encode("utf-8")
+    data = gzip.compress(raw)
+    print(f"{rows:,} rows, {len(raw) / 2**20:.1f} MiB decompressed")
+
+    peak_bytes, elapsed = peak(read_whole, data)
+    print(
+        f"{'read().splitlines()':<30} peak {peak_bytes / 2**20:8.1f} MiB  ({elapsed:.2f}s)"
+    )
+    for chunk_size in (64 * 1024, 256 * 1024, 1024 * 1024):
+        peak_bytes, elapsed = peak(read_streaming, data, chunk_size)
+        label = f"FileIterator chunk={chunk_size // 1024}KiB"
+        print(f"{label:<30} peak {peak_bytes / 2**20:8.1f} MiB  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
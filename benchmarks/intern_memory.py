@@ -0,0 +1,42 @@
+"""
+Memory held by a materialized batch of entries with and without interning of
+the ``LogFormat.interned`` fields.
+
+    python -m benchmarks.intern_memory [rows]
+"""
+
+import sys
+import tracemalloc
+
+from .common import sample_lines, timed
+
+from aws_log_parser import AwsLogParser, LogType
+
+
+def materialize(log_type, lines, intern_strings):
+    tracemalloc.start()
+    entries, elapsed = timed(
+        list, AwsLogParser(log_type, intern_strings=intern_strings).parse(lines)
+    )
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return entries, size, elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for name in ("ClassicLoadBalancer", "LoadBalancer", "CloudFront"):
+        log_type = getattr(LogType, name)
+        lines = sample_lines(name, rows)
+        for intern_strings in (False, True):
+            entries, size, elapsed = materialize(log_type, lines, intern_strings)
+            label = f"{name} intern_strings={intern_strings}"
+            print(
+                f"{label:<40} {size / 2**20:8.1f} MiB "
+                f"{size / rows:6.0f} B/entry  ({elapsed:.2f}s)"
+            )
+            del entries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Lines/sec of splitting a local plain log file with chunked reads and from a
+memory map, and rows/sec of parsing it both ways.
+
+    python -m benchmarks.mmap_read [rows]
+"""
+
+import sys
+import tempfile
+
+from pathlib import Path
+
+from .common import report, sample_lines, timed
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.io import FileIterator
+
+
+def read_lines(path, **kwargs):
+    return list(FileIterator(path, **kwargs))
+
+
+def read(url, **kwargs):
+    return list(AwsLogParser(LogType.LoadBalancer, **kwargs).read_url(url))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "LoadBalancer.log"
+        path.write_text("\n".join(sample_lines("LoadBalancer", rows)) + "\n")
+        for binary in (False, True):
+            label = "bytes" if binary else "str"
+            lines, elapsed = timed(read_lines, path, binary=binary)
+            report(f"lines read(), {label}", rows, elapsed)
+            mapped, elapsed = timed(read_lines, path, binary=binary, mmap=True)
+            assert mapped == lines
+            report(f"lines mmap, {label}", rows, elapsed)
+        entries, elapsed = timed(read, f"file://{path}")
+        report("parse read()", rows, elapsed)
+        mapped, elapsed = timed(read, f"file://{path}", mmap=True)
+        assert mapped == entries
+        report("parse mmap", rows, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Rows/sec of ``AwsLogParser.parse_csv`` against the per-value ``to_python``
+decoding it replaced, with memoized converters, with tuple and namedtuple
+records, with a narrow ``fields`` projection, with lazy entries and with a
+filter rejecting every row.
+
+    python -m benchmarks.parse_csv [rows]
+"""
+
+import csv
+import sys
+
+from dataclasses import fields
+
+from .common import report, sample_lines, timed
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.parser import to_python
+
+
+def parse_per_value(log_type, lines):
+    model_fields = fields(log_type.model)
+    return [
+        log_type.model(
+            *[to_python(value, field) for value, field in zip(row, model_fields)]
+        )
+        for row in csv.reader(lines, delimiter=log_type.delimiter)
+    ]
+
+
+def parse_compiled(log_type, lines, **kwargs):
+    return list(AwsLogParser(log_type, **kwargs).parse(lines))
+
+
+def parse_lazy(log_type, lines, fields):
+    entries = list(AwsLogParser(log_type, lazy=True).parse(lines))
+    for entry in entries:
+        for name in fields:
+            getattr(entry, name)
+    return entries
+
+
+PROJECTIONS = {
+    "ClassicLoadBalancer": ["timestamp", "client", "elb_status_code"],
+    "LoadBalancer": [
+        "timestamp",
+        "client",
+        "elb_status_code",
+        "target_processing_time",
+    ],
+    "CloudFront": ["date", "time", "client_ip", "status_code"],
+}
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    for name in ("ClassicLoadBalancer", "LoadBalancer", "CloudFront"):
+        log_type = getattr(LogType, name)
+        lines = sample_lines(name, rows)
+        before, before_elapsed = timed(parse_per_value, log_type, lines)
+        after, after_elapsed = timed(parse_compiled, log_type, lines)
+        assert before == after
+        report(f"{name} to_python", rows, before_elapsed)
+        report(f"{name} compiled", rows, after_elapsed)
+        _, elapsed = timed(parse_compiled, log_type, lines, memoize=True)
+        report(f"{name} memoize", rows, elapsed)
+        for record_type in ("tuple", "namedtuple"):
+            _, elapsed = timed(parse_compiled, log_type, lines, record_type=record_type)
+            report(f"{name} {record_type} records", rows, elapsed)
+        fields = PROJECTIONS[name]
+        _, elapsed = timed(parse_compiled, log_type, lines, fields=fields)
+        report(f"{name} fields={len(fields)}", rows, elapsed)
+        _, elapsed = timed(parse_lazy, log_type, lines, fields)
+        report(f"{name} lazy, {len(fields)} read", rows, elapsed)
+        # Every row is rejected on a single column.
+        filters = [(fields[-1], "==", -1)]
+        _, elapsed = timed(parse_compiled, log_type, lines, filters=filters)
+        report(f"{name} filtered out", rows, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Records/sec of WAF decoding with dataclasses_json ``from_json`` against the
+compiled ``json_decoder``, with ``json`` and, when installed, ``orjson``.
+
+    python -m benchmarks.parse_waf [records]
+"""
+
+import json
+import sys
+
+from .common import DATA_DIR, report, timed
+
+from aws_log_parser.models import WafLogEntry
+from aws_log_parser.parser import json_decoder
+
+
+def parse_from_json(records):
+    return [WafLogEntry.from_json(record) for record in records]
+
+
+def parse_compiled(records, loads):
+    decode = json_decoder(WafLogEntry)
+    return [decode(loads(record)) for record in records]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    record = json.dumps(json.loads((DATA_DIR / "waf_log.json").read_text()))
+    records = [record] * count
+
+    before, elapsed = timed(parse_from_json, records)
+    report("WAF from_json", count, elapsed)
+    backends = {"json": json.loads}
+    try:
+        import orjson
+
+        backends["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    for name, loads in backends.items():
+        after, elapsed = timed(parse_compiled, records, loads)
+        assert before == after
+        report(f"WAF json_decoder, {name}", count, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Time to finish parsing a large local log file interrupted at 90%, starting
+over versus resuming from the last recorded FileOffset, plain and gzipped.
+
+    python -m benchmarks.resume [rows]
+"""
+
+import gzip
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from .common import sample_lines
+
+from aws_log_parser import AwsLogParser, LogType
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    content = ("\n".join(sample_lines("LoadBalancer", rows)) + "\n").encode()
+    parser = AwsLogParser(LogType.LoadBalancer)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        plain = Path(tmpdir) / "LoadBalancer.log"
+        plain.write_bytes(content)
+        # Written in members of 50,000 lines like rotated and concatenated logs.
+        lines = content.splitlines(keepends=True)
+        gzipped = Path(tmpdir) / "LoadBalancer.log.gz"
+        gzipped.write_bytes(
+            b"".join(
+                gzip.compress(b"".join(lines[start : start + 50_000]))
+                for start in range(0, len(lines), 50_000)
+            )
+        )
+        for path in (plain, gzipped):
+            url = f"file://{path}"
+            # The offset of the last batch before the interruption.
+            checkpoint, parsed = None, 0
+            for entries, offset in parser.read_batches(url):
+                parsed += len(entries)
+                if parsed >= rows * 0.9:
+                    break
+                checkpoint = offset
+
+            start = time.perf_counter()
+            count = sum(1 for _ in parser.read_url(url))
+            restart = time.perf_counter() - start
+            start = time.perf_counter()
+            resumed = sum(
+                len(entries) for entries, _ in parser.read_batches(url, checkpoint)
+            )
+            elapsed = time.perf_counter() - start
+            assert count == rows
+            print(
+                f"{path.name:<20} restart {restart:7.3f}s  resume {elapsed:7.3f}s"
+                f"  ({resumed:,} rows from {checkpoint})"
+            )
+
+
+if __name__ == "__main__":
+    main()
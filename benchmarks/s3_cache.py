@@ -0,0 +1,80 @@
+"""
+Rows/sec of parsing S3 objects downloaded on every run versus read from the
+local object cache. Every read of an object body is throttled to simulate
+the bandwidth of S3.
+
+    python -m benchmarks.s3_cache [objects] [rows per object] [MB/s]
+"""
+
+import io
+import sys
+import tempfile
+import time
+
+from .common import report, sample_lines, timed
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.aws.s3 import S3Service
+
+
+class SlowBody:
+    def __init__(self, data, bandwidth):
+        self.fh = io.BytesIO(data)
+        self.bandwidth = bandwidth
+
+    def read(self, amt=None):
+        data = self.fh.read(amt)
+        time.sleep(len(data) / self.bandwidth)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+class SlowS3Client:
+    def __init__(self, objects, bandwidth):
+        self.objects = objects
+        self.bandwidth = bandwidth
+
+    def get_paginator(self, *_):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {
+            "Contents": [
+                {"Key": key, "ETag": f'"{index}"', "LastModified": index}
+                for index, key in enumerate(sorted(self.objects))
+            ]
+        }
+
+    def get_object(self, Bucket, Key, IfMatch=None):
+        data = self.objects[Key]
+        return {"Body": SlowBody(data, self.bandwidth), "ContentLength": len(data)}
+
+
+def read(**kwargs):
+    parser = AwsLogParser(LogType.LoadBalancer, **kwargs)
+    return list(parser.read_url("s3://bucket/logs/"))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    bandwidth = float(sys.argv[3]) * 1e6 if len(sys.argv) > 3 else 10e6
+    data = ("\n".join(sample_lines("LoadBalancer", rows)) + "\n").encode()
+    objects = {f"logs/{index:04}.log": data for index in range(count)}
+    S3Service.client = SlowS3Client(objects, bandwidth)  # type: ignore
+    total = count * rows
+    print(f"{count} objects of {len(data) / 1e6:.1f}MB, {bandwidth / 1e6:.0f}MB/s")
+
+    expected, elapsed = timed(read)
+    report("download", total, elapsed)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("cache, cold", "cache, warm"):
+            entries, elapsed = timed(read, cache_dir=cache_dir)
+            assert entries == expected
+            report(label, total, elapsed)
+
+
+if __name__ == "__main__":
+    main()
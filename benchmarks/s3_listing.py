@@ -0,0 +1,95 @@
+"""
+Time to first key and total time of listing a date partitioned ALB prefix,
+sorting the whole listing versus streaming the daily partitions. Every
+listing page is delayed to simulate the round trip to S3.
+
+    python -m benchmarks.s3_listing [days] [keys per day] [ms per page]
+"""
+
+import bisect
+import sys
+import time
+
+from aws_log_parser import LogType
+from aws_log_parser.aws import AwsClient
+from aws_log_parser.aws.s3 import S3Service
+
+PREFIX = "AWSLogs/123456789012/elasticloadbalancing/us-east-1/"
+
+PAGE_SIZE = 1000
+
+
+class SlowPaginator:
+    def __init__(self, keys, latency):
+        self.keys = keys
+        self.latency = latency
+
+    def paginate(self, Bucket, Prefix, Delimiter=None):
+        start = bisect.bisect_left(self.keys, Prefix)
+        end = bisect.bisect_left(self.keys, Prefix + "\uffff")
+        contents, prefixes = [], []
+        for key in self.keys[start:end]:
+            index = key.find(Delimiter, len(Prefix)) if Delimiter else -1
+            if index == -1:
+                contents.append({"Key": key, "LastModified": key})
+            elif not prefixes or prefixes[-1] != key[: index + 1]:
+                prefixes.append(key[: index + 1])
+        for page in range(0, max(len(contents), len(prefixes), 1), PAGE_SIZE):
+            time.sleep(self.latency)
+            yield {
+                "Contents": contents[page : page + PAGE_SIZE],
+                "CommonPrefixes": [
+                    {"Prefix": prefix} for prefix in prefixes[page : page + PAGE_SIZE]
+                ],
+            }
+
+
+class SlowS3Client:
+    def __init__(self, keys, latency):
+        self.paginator = SlowPaginator(keys, latency)
+
+    def get_paginator(self, *_):
+        return self.paginator
+
+
+def timed_listing(keys):
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in keys:
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    return count, first, time.perf_counter() - start
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.05
+    keys = sorted(
+        f"{PREFIX}2024/{1 + day // 28:02}/{1 + day % 28:02}/{index:06}.log.gz"
+        for day in range(days)
+        for index in range(per_day)
+    )
+    S3Service.client = SlowS3Client(keys, latency)  # type: ignore
+    s3_service = S3Service(aws_client=AwsClient())
+    print(f"{len(keys):,} keys over {days} days, {latency * 1000:.0f}ms per page")
+
+    runs = [("sorted listing", {})] + [
+        (
+            f"partitioned, concurrency={concurrency}",
+            {"layout": LogType.LoadBalancer.key_layout, "concurrency": concurrency},
+        )
+        for concurrency in (1, 16)
+    ]
+    for label, kwargs in runs:
+        count, first, total = timed_listing(
+            s3_service.list_keys("bucket", PREFIX, **kwargs)
+        )
+        assert count == len(keys)
+        print(f"{label:<32} first key {first:7.3f}s  total {total:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Time to first entry and peak RSS when reading a large S3 object, streaming the
+``StreamingBody`` versus buffering it with ``read()`` first. The download is
+simulated with a throttled body over a local file; each mode runs in a freshly
+spawned process and reports its VmHWM (Linux).
+
+    python -m benchmarks.s3_stream [rows] [MiB/s]
+"""
+
+import gzip
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from io import BytesIO
+
+from botocore.response import StreamingBody
+
+from .common import sample_lines
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.io import FileIterator
+
+
+class ThrottledStream:
+    def __init__(self, stream, bandwidth):
+        self.stream = stream
+        self.bandwidth = bandwidth
+
+    def read(self, amt=None):
+        data = self.stream.read(amt)
+        time.sleep(len(data) / self.bandwidth)
+        return data
+
+    def close(self):
+        self.stream.close()
+
+
+def peak_rss():
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+
+
+def run(mode, path, bandwidth, results):
+    body = StreamingBody(
+        ThrottledStream(open(path, "rb"), bandwidth), os.path.getsize(path)
+    )
+    start = time.perf_counter()
+    fileobj = BytesIO(body.read()) if mode == "buffered" else body
+    first = None
+    entries = AwsLogParser(LogType.LoadBalancer).parse(
+        FileIterator(fileobj=fileobj, gzipped=True)
+    )
+    for _ in entries:
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    results.put((mode, first, total, peak_rss()))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    bandwidth = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    # A random trailing column keeps the object from compressing unrealistically.
+    lines = [
+        f'{line} "{os.urandom(16).hex()}"'
+        for line in sample_lines("LoadBalancer", rows)
+    ]
+    data = gzip.compress("\n".join(lines).encode())
+    print(f"{rows:,} rows, {len(data) / 2**20:.1f} MiB gzipped at {bandwidth} MiB/s")
+
+    path = tempfile.NamedTemporaryFile(suffix=".gz", delete=False).name
+    with open(path, "wb") as fh:
+        fh.write(data)
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    for mode in ("buffered", "streaming"):
+        process = context.Process(
+            target=run, args=(mode, path, bandwidth * 2**20, results)
+        )
+        process.start()
+        mode, first, total, maxrss = results.get()
+        process.join()
+        print(
+            f"{mode:<10} first entry {first * 1000:8.1f} ms  "
+            f"total {total:6.2f}s  peak rss {maxrss / 2**20:7.1f} MiB"
+        )
+    os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
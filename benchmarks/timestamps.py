@@ -0,0 +1,72 @@
+"""
+Microbenchmark of the timestamp decoders against the previous implementations.
+
+    python -m benchmarks.timestamps [count]
+"""
+
+import dataclasses
+import datetime
+import sys
+import timeit
+
+from aws_log_parser.models import CloudFrontWebDistributionLogEntry
+from aws_log_parser.parser import to_datetime, to_datetime_fixed
+
+
+def legacy_to_datetime(value):
+    return datetime.datetime.fromisoformat(value.rstrip("Z")).replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+def legacy_timestamp(entry):
+    return datetime.datetime.fromisoformat(
+        f"{entry.date}T{entry.time}",
+    ).replace(tzinfo=datetime.timezone.utc)
+
+
+def report(label, count, elapsed):
+    print(f"{label:<36} {elapsed / count * 1e9:8.0f} ns/value")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    # One hour of ALB timestamps, one request every 18ms.
+    start = datetime.datetime(2024, 12, 26, 10, tzinfo=datetime.timezone.utc)
+    values = [
+        (start + datetime.timedelta(microseconds=18_000 * i)).strftime(
+            "%Y-%m-%dT%H:%M:%S.%fZ"
+        )
+        for i in range(count)
+    ]
+
+    for label, func in (
+        ("to_datetime (previous)", legacy_to_datetime),
+        ("to_datetime_fixed (minute cache)", to_datetime_fixed),
+        ("to_datetime", to_datetime),
+    ):
+        elapsed = timeit.timeit(lambda: [func(value) for value in values], number=1)
+        report(label, count, elapsed)
+
+    entries = [
+        CloudFrontWebDistributionLogEntry(
+            *[None] * len(dataclasses.fields(CloudFrontWebDistributionLogEntry))
+        )
+        for _ in range(count)
+    ]
+    for entry in entries:
+        object.__setattr__(entry, "date", datetime.date(2024, 12, 26))
+        object.__setattr__(entry, "time", datetime.time(10, 0, 1))
+
+    elapsed = timeit.timeit(
+        lambda: [legacy_timestamp(entry) for entry in entries], number=1
+    )
+    report("CloudFront timestamp (previous)", count, elapsed)
+    elapsed = timeit.timeit(lambda: [entry.timestamp for entry in entries], number=1)
+    report("CloudFront timestamp (first)", count, elapsed)
+    elapsed = timeit.timeit(lambda: [entry.timestamp for entry in entries], number=1)
+    report("CloudFront timestamp (cached)", count, elapsed)
+
+
+if __name__ == "__main__":
+    main()
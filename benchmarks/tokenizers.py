@@ -0,0 +1,66 @@
+"""
+Rows/sec of parsing log lines with the csv and bytes tokenizers, and the elb
+tokenizer for the load balancer logs, for full entries and for a narrow
+``fields`` projection. The lines are read beforehand by ``FileIterator`` as
+the parser would read them, bytes for the bytes tokenizer, and the best of a
+few runs is reported.
+
+    python -m benchmarks.tokenizers [rows] [runs]
+"""
+
+import sys
+import tempfile
+
+from pathlib import Path
+
+from .common import report, sample_lines, timed
+from .parse_csv import PROJECTIONS
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.io import FileIterator
+
+
+TOKENIZERS = {
+    "ClassicLoadBalancer": ("csv", "bytes", "elb"),
+    "LoadBalancer": ("csv", "bytes", "elb"),
+    "CloudFront": ("csv", "bytes"),
+}
+
+
+def parse(log_type, lines, **kwargs):
+    return list(AwsLogParser(log_type, **kwargs).parse(lines))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in ("ClassicLoadBalancer", "LoadBalancer", "CloudFront"):
+            log_type = getattr(LogType, name)
+            path = Path(tmpdir) / f"{name}.log"
+            path.write_text("\n".join(sample_lines(name, rows)) + "\n")
+            lines = {
+                binary: list(FileIterator(path, binary=binary))
+                for binary in (False, True)
+            }
+            for fields in (None, PROJECTIONS[name]):
+                label = f"fields={len(fields)}" if fields else "all fields"
+                expected = None
+                for tokenizer in TOKENIZERS[name]:
+                    elapsed = float("inf")
+                    for _ in range(runs):
+                        entries, run_elapsed = timed(
+                            parse,
+                            log_type,
+                            lines[tokenizer == "bytes"],
+                            tokenizer=tokenizer,
+                            fields=fields,
+                        )
+                        elapsed = min(elapsed, run_elapsed)
+                    assert expected is None or entries == expected
+                    expected = entries
+                    report(f"{name} {tokenizer}, {label}", rows, elapsed)
+
+
+if __name__ == "__main__":
+    main()
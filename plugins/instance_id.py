@@ -38,5 +38,5 @@ class AwsPluginInstanceId(AwsPluginBase):
         instance_ids = self.lookup({log_entry.client_ip for log_entry in log_entries})
 
         for log_entry in log_entries:
-            setattr(log_entry, self.attr_name, instance_ids.get(log_entry.client_ip))
+            self.set_attr(log_entry, instance_ids.get(log_entry.client_ip))
             yield log_entry
@@ -47,5 +47,5 @@ class AwsPluginInstanceName(AwsPluginBase):
         )
 
         for log_entry in log_entries:
-            setattr(log_entry, self.attr_name, instance_names.get(log_entry.client_ip))
+            self.set_attr(log_entry, instance_names.get(log_entry.client_ip))
             yield log_entry
@@ -0,0 +1,72 @@
+import pickle
+import pytest
+import threading
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.aws import AwsClient
+from aws_log_parser.aws.s3 import S3Service
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+def test_session_cached():
+    aws_client = AwsClient(region="us-east-1")
+    assert aws_client.aws_session is aws_client.aws_session
+
+
+def test_clients_cached():
+    aws_client = AwsClient(region="us-east-1")
+    assert aws_client.s3_client is aws_client.aws_client("s3")
+    assert aws_client.ec2_client is aws_client.ec2_client
+    assert aws_client.ec2_client is not aws_client.s3_client
+
+
+def test_s3_service_cached():
+    aws_client = AwsClient(region="us-east-1")
+    assert isinstance(aws_client.s3_service, S3Service)
+    assert aws_client.s3_service is aws_client.s3_service
+    assert aws_client.s3_service.client is aws_client.s3_client
+
+
+def test_clients_cached_across_threads():
+    aws_client = AwsClient(region="us-east-1")
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(aws_client.s3_client))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_client_config():
+    aws_client = AwsClient(
+        region="us-east-1",
+        max_pool_connections=32,
+        retry_mode="adaptive",
+    )
+    config = aws_client.s3_client.meta.config
+    assert config.max_pool_connections == 32
+    assert config.retries["mode"] == "adaptive"
+
+
+def test_parser_pool_follows_fetch_concurrency():
+    parser = AwsLogParser(
+        LogType.LoadBalancer, region="us-east-1", fetch_concurrency=64
+    )
+    assert parser.aws_client.s3_client.meta.config.max_pool_connections == 64
+
+
+def test_pickle():
+    aws_client = AwsClient(region="us-east-1", max_pool_connections=32)
+    aws_client.s3_client
+    unpickled = pickle.loads(pickle.dumps(aws_client))
+    assert unpickled == aws_client
+    assert unpickled.s3_client.meta.config.max_pool_connections == 32
@@ -0,0 +1,233 @@
+import datetime
+import gzip
+import io
+import os
+import pickle
+import threading
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.aws import AwsClient
+from aws_log_parser.aws.s3 import S3Service
+from aws_log_parser.cache import ObjectCache
+
+
+CLOUDFRONT_LOG = (
+    Path(__file__).parent / "data" / "cloudfront-multiple.log"
+).read_bytes()
+
+
+@dataclass
+class MockBody:
+    data: bytes
+
+    def __post_init__(self):
+        self.fh = io.BytesIO(self.data)
+
+    def read(self, amt=None):
+        return self.fh.read(amt)
+
+    def close(self):
+        self.fh.close()
+
+
+@dataclass
+class MockPaginator:
+    objects: dict
+
+    def paginate(self, Bucket, Prefix, Delimiter=None):
+        yield {
+            "Contents": [
+                {
+                    "Key": key,
+                    "LastModified": datetime.datetime.now(datetime.timezone.utc),
+                    "ETag": etag,
+                    "Size": len(data),
+                }
+                for key, (data, etag) in sorted(self.objects.items())
+                if key.startswith(Prefix)
+            ]
+        }
+
+
+@dataclass
+class MockCachingS3Client:
+    objects: dict
+    downloads: list = field(default_factory=list)
+
+    def get_paginator(self, *_):
+        return MockPaginator(self.objects)
+
+    def head_object(self, Bucket, Key):
+        return {"ETag": self.objects[Key][1]}
+
+    def get_object(self, Bucket, Key, IfMatch=None, Range=None):
+        data, etag = self.objects[Key]
+        assert IfMatch in (None, etag)
+        self.downloads.append(Key)
+        if Range is not None:
+            data = data[int(Range.removeprefix("bytes=").rstrip("-")) :]
+        return {"Body": MockBody(data), "ContentLength": len(data)}
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    client = MockCachingS3Client(
+        {
+            "logs/a.log": (CLOUDFRONT_LOG, '"a1"'),
+            "logs/b.log.gz": (gzip.compress(CLOUDFRONT_LOG), '"b1"'),
+        }
+    )
+    monkeypatch.setattr(S3Service, "client", client)
+    return client
+
+
+def cached_files(path):
+    return sorted(entry.name for entry in path.glob("*/*"))
+
+
+@pytest.mark.parametrize("fetch_concurrency", [1, 2])
+def test_parser_cache(tmp_path, s3_client, fetch_concurrency):
+    expected = list(
+        AwsLogParser(LogType.CloudFront, file_suffix="").read_url("s3://bucket/logs/")
+    )
+    s3_client.downloads.clear()
+    parser = AwsLogParser(
+        LogType.CloudFront,
+        file_suffix="",
+        cache_dir=tmp_path,
+        fetch_concurrency=fetch_concurrency,
+    )
+    assert list(parser.read_url("s3://bucket/logs/")) == expected
+    assert sorted(s3_client.downloads) == ["logs/a.log", "logs/b.log.gz"]
+    assert len(cached_files(tmp_path)) == 2
+
+    assert list(parser.read_url("s3://bucket/logs/")) == expected
+    assert len(s3_client.downloads) == 2
+    assert parser.cache.stats.hits == 2
+    assert parser.cache.stats.misses == 2
+    assert parser.cache.stats.bytes_saved == sum(
+        len(data) for data, _ in s3_client.objects.values()
+    )
+
+
+def test_parser_cache_changed_object(tmp_path, s3_client):
+    parser = AwsLogParser(LogType.CloudFront, file_suffix="", cache_dir=tmp_path)
+    assert len(list(parser.read_url("s3://bucket/logs/a.log"))) == 6
+    # The headers and the first entry.
+    changed = b"".join(CLOUDFRONT_LOG.splitlines(True)[:3])
+    s3_client.objects["logs/a.log"] = (changed, '"a2"')
+    assert len(list(parser.read_url("s3://bucket/logs/a.log"))) == 1
+    assert s3_client.downloads == ["logs/a.log", "logs/a.log"]
+
+
+def test_parser_cache_workers(tmp_path, s3_client):
+    parser = AwsLogParser(
+        LogType.CloudFront, file_suffix="", cache_dir=tmp_path, workers=2
+    )
+    assert len(list(parser.read_url("s3://bucket/logs/"))) == 12
+    assert len(cached_files(tmp_path)) == 2
+
+
+def test_read_key_head_object(tmp_path, s3_client):
+    s3_service = S3Service(aws_client=AwsClient())
+    cache = ObjectCache(tmp_path)
+    for _ in range(2):
+        assert (
+            len(list(s3_service.read_key("bucket", "logs/b.log.gz", cache=cache))) == 8
+        )
+    assert s3_client.downloads == ["logs/b.log.gz"]
+    assert cached_files(tmp_path)[0].endswith(".gz")
+
+
+def test_read_key_larger_than_cache(tmp_path, s3_client):
+    s3_service = S3Service(aws_client=AwsClient())
+    cache = ObjectCache(tmp_path, max_size=100)
+    assert len(list(s3_service.read_key("bucket", "logs/a.log", cache=cache))) == 8
+    assert cached_files(tmp_path) == []
+    # The response body is read rather than requested again.
+    assert s3_client.downloads == ["logs/a.log"]
+
+
+def test_read_key_larger_than_cache_resume(tmp_path, s3_client):
+    s3_service = S3Service(aws_client=AwsClient())
+    cache = ObjectCache(tmp_path, max_size=100)
+    batches = list(
+        s3_service.read_key_batches("bucket", "logs/a.log", cache=cache, chunk_size=300)
+    )
+    lines, offset = batches[1]
+    rest = [line for lines, _ in batches[2:] for line in lines]
+    resumed = s3_service.read_key(
+        "bucket", "logs/a.log", cache=cache, resume_from=offset
+    )
+    assert list(resumed) == rest
+    assert cached_files(tmp_path) == []
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ObjectCache(tmp_path, max_size=25)
+    for name in ("a", "b"):
+        cache.store("bucket", name, "1", MockBody(b"0123456789")).close()
+    os.utime(cache.entry_path("bucket", "a", "1"), (1000, 1000))
+    os.utime(cache.entry_path("bucket", "b", "1"), (2000, 2000))
+    # Reading a makes b the least recently used.
+    cache.open("bucket", "a", "1").close()
+    cache.store("bucket", "c", "1", MockBody(b"0123456789")).close()
+    assert not cache.entry_path("bucket", "b", "1").exists()
+    assert cache.entry_path("bucket", "a", "1").exists()
+    assert cache.stats.evictions == 1
+
+
+def test_cache_evicted_while_open(tmp_path):
+    cache = ObjectCache(tmp_path, max_size=0)
+    with cache.store("bucket", "a", "1", MockBody(b"abc")) as fh:
+        assert cache.stats.evictions == 1
+        assert fh.read() == b"abc"
+    assert cache.open("bucket", "a", "1") is None
+
+
+def test_cache_concurrent_stores(tmp_path):
+    cache = ObjectCache(tmp_path)
+    barrier = threading.Barrier(8)
+
+    def store(index):
+        barrier.wait()
+        with cache.store("bucket", "a", "1", MockBody(b"x" * 100_000)) as fh:
+            return fh.read()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(store, range(8))) == {b"x" * 100_000}
+    # No partially written entries are left behind.
+    assert [path.name for path in tmp_path.glob("*/*")] == [
+        cache.entry_path("bucket", "a", "1").name
+    ]
+
+
+def test_cache_pickle(tmp_path):
+    cache = ObjectCache(tmp_path)
+    cache.store("bucket", "a", "1", MockBody(b"abc")).close()
+    cache.open("bucket", "a", "1").close()
+    copied = pickle.loads(pickle.dumps(cache))
+    assert copied.stats.hits == 0
+    with copied.open("bucket", "a", "1") as fh:
+        assert fh.read() == b"abc"
+
+
+@pytest.mark.parametrize("key", ["logs/a.log", "logs/b.log.gz"])
+def test_read_key_cached_resume(tmp_path, s3_client, key):
+    s3_service = S3Service(aws_client=AwsClient())
+    cache = ObjectCache(tmp_path)
+    batches = list(
+        s3_service.read_key_batches("bucket", key, cache=cache, chunk_size=300)
+    )
+    assert len(batches) > 2
+    lines, offset = batches[1]
+    rest = [line for lines, _ in batches[2:] for line in lines]
+    for _ in range(2):
+        resumed = s3_service.read_key("bucket", key, cache=cache, resume_from=offset)
+        assert list(resumed) == rest
+    assert s3_client.downloads == [key]
@@ -0,0 +1,112 @@
+import os
+import pickle
+import pytest
+
+from pathlib import Path
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.checkpoints import CheckpointStore
+
+
+LINE = (Path(__file__).parent / "data" / "loadbalancer_http_entry.csv").read_text()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(tmp_path / "checkpoints.db")
+
+
+def test_processed(store):
+    file = {"Key": "a.log", "ETag": '"1"', "Size": 10, "LastModified": 1}
+    assert not store.processed("s3://bucket", file)
+    store.mark("s3://bucket", file)
+    assert store.processed("s3://bucket", file)
+    assert not store.processed("s3://other", file)
+    assert not store.processed("s3://bucket", {**file, "ETag": '"2"'})
+    assert not store.processed("s3://bucket", {**file, "Size": 11})
+
+
+def test_start_after(store):
+    assert store.start_after("s3://bucket", "logs/") is None
+    for partition in ("logs/2024/01/01/", "logs/2024/01/02/", "logs/2024/01/03/"):
+        store.mark("s3://bucket", {"Key": f"{partition}a.log"}, partition)
+    store.mark("s3://bucket", {"Key": "other/2024/01/04/a.log"}, "other/2024/01/04/")
+    assert store.start_after("s3://bucket", "logs/") == "logs/2024/01/02/"
+    assert store.start_after("s3://bucket", "other/") == "other/2024/01/04/"
+
+
+def test_start_after_windowed(store):
+    store.mark("s3://bucket", {"Key": "logs/2024/01/01/a.log"}, "logs/2024/01/01/")
+    for partition in ("logs/2024/01/03/", "logs/2024/01/04/"):
+        store.mark(
+            "s3://bucket", {"Key": f"{partition}a.log"}, partition, windowed=True
+        )
+    # The partitions of windowed runs may follow unprocessed ones.
+    assert store.start_after("s3://bucket", "logs/") == "logs/2024/01/01/"
+
+
+def test_store_pickle(store):
+    store.mark("s3://bucket", {"Key": "a.log"})
+    copied = pickle.loads(pickle.dumps(store))
+    assert copied.processed("s3://bucket", {"Key": "a.log"})
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    path = tmp_path / "logs"
+    path.mkdir()
+    for name in ("a.log", "b.log"):
+        (path / name).write_text(LINE * 2)
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parser_incremental_files(tmp_path, log_dir, workers):
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        checkpoint_path=tmp_path / "checkpoints.db",
+        workers=workers,
+    )
+    url = f"file://{log_dir}"
+    assert len(list(parser.read_url(url, incremental=True))) == 4
+    assert list(parser.read_url(url, incremental=True)) == []
+
+    with (log_dir / "b.log").open("a") as fh:
+        fh.write(LINE)
+    (log_dir / "c.log").write_text(LINE)
+    assert len(list(parser.read_url(url, incremental=True))) == 4
+    assert len(list(parser.read_url(url))) == 6
+
+
+def test_parser_incremental_touched_file(tmp_path, log_dir):
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        checkpoint_path=tmp_path / "checkpoints.db",
+        incremental=True,
+    )
+    assert len(list(parser.read_url(f"file://{log_dir}"))) == 4
+    stat = (log_dir / "a.log").stat()
+    os.utime(log_dir / "a.log", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert len(list(parser.read_url(f"file://{log_dir}"))) == 2
+
+
+def test_parser_incremental_interrupted(tmp_path, log_dir):
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        checkpoint_path=tmp_path / "checkpoints.db",
+        incremental=True,
+    )
+    entries = parser.read_url(f"file://{log_dir}")
+    for _ in range(3):
+        next(entries)
+    entries.close()
+    # The second file wasn't fully processed.
+    assert len(list(parser.read_url(f"file://{log_dir}"))) == 2
+
+
+def test_parser_incremental_without_store(log_dir):
+    with pytest.raises(ValueError):
+        AwsLogParser(LogType.LoadBalancer, incremental=True)
+    parser = AwsLogParser(LogType.LoadBalancer)
+    with pytest.raises(ValueError):
+        list(parser.read_url(f"file://{log_dir}", incremental=True))
@@ -0,0 +1,116 @@
+import datetime
+import pytest
+
+from dataclasses import fields
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser import interface
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(params=["csv", "bytes"])
+def loadbalancer_parser(request):
+    return AwsLogParser(
+        LogType.LoadBalancer,
+        regex_filter=r"^loadbalancer_.*\.csv$",
+        tokenizer=request.param,
+    )
+
+
+def read_batch(parser, path, **kwargs):
+    (batch,) = parser.read_columns(f"file://{path}", **kwargs)
+    return batch
+
+
+def test_read_columns(shared_datadir, loadbalancer_parser):
+    entries = list(loadbalancer_parser.read_url(f"file://{shared_datadir}"))
+    batch = read_batch(loadbalancer_parser, shared_datadir)
+    assert list(batch) == [field.name for field in fields(LogType.LoadBalancer.model)]
+
+    assert batch["elb_status_code"].dtype == np.int64
+    assert batch["elb_status_code"].tolist() == [e.elb_status_code for e in entries]
+    assert batch["target_processing_time"].dtype == np.float64
+    assert batch["target_processing_time"].tolist() == [
+        e.target_processing_time for e in entries
+    ]
+    assert batch["sent_bytes"].sum() == sum(e.sent_bytes for e in entries)
+    assert batch["target_status_code"].tolist() == [
+        e.target_status_code for e in entries
+    ]
+    assert batch["timestamp"].dtype == np.dtype("datetime64[us]")
+    assert batch["timestamp"].tolist() == [
+        e.timestamp.replace(tzinfo=None) for e in entries
+    ]
+    for name in ("client", "http_request", "user_agent", "actions_executed"):
+        assert batch[name].decode().tolist() == [getattr(e, name) for e in entries]
+
+
+def test_read_columns_dictionary_encoded(shared_datadir, loadbalancer_parser):
+    batch = read_batch(loadbalancer_parser, shared_datadir, fields=["elb"])
+    assert list(batch) == ["elb"]
+    assert len(batch["elb"]) > len(batch["elb"].values)
+    assert (
+        batch["elb"].values[batch["elb"].codes[0]]
+        == "app/my-loadbalancer/50dc6c495c0c9188"
+    )
+
+
+def test_read_columns_batch_size(shared_datadir, loadbalancer_parser):
+    batches = list(
+        loadbalancer_parser.read_columns(
+            f"file://{shared_datadir}", fields=["sent_bytes"], batch_size=5
+        )
+    )
+    assert [len(batch["sent_bytes"]) for batch in batches] == [5, 5, 2]
+
+
+def test_read_columns_shares_clients(shared_datadir, loadbalancer_parser, monkeypatch):
+    aws_client = loadbalancer_parser.aws_client
+    monkeypatch.setattr(interface, "AwsClient", None)
+    for _ in range(2):
+        read_batch(loadbalancer_parser, shared_datadir, fields=["elb"])
+    assert loadbalancer_parser.aws_client is aws_client
+    assert loadbalancer_parser.record_type is None
+
+
+def test_read_columns_filters(shared_datadir):
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        regex_filter=r"^loadbalancer_.*\.csv$",
+        filters=[("elb_status_code", "==", 502)],
+    )
+    batch = read_batch(parser, shared_datadir, fields=["elb_status_code"])
+    assert batch["elb_status_code"].tolist() == [502] * 4
+
+
+def test_read_columns_cloudfront(shared_datadir):
+    batch = read_batch(
+        AwsLogParser(LogType.CloudFront),
+        shared_datadir / "cloudfront-multiple.log",
+        fields=["date", "time", "time_taken"],
+    )
+    assert batch["date"][0] == np.datetime64("2019-12-04")
+    assert batch["time"][0].astype(datetime.timedelta) == datetime.timedelta(
+        hours=21, minutes=2, seconds=31
+    )
+    assert batch["time_taken"].tolist() == [0.001, 0.0, 0.001, 0.102, 0.107, 0.103]
+
+
+@pytest.mark.parametrize(
+    "log_type,names",
+    [
+        (LogType.LoadBalancer, ["nope"]),
+        (LogType.WAF, None),
+    ],
+)
+def test_read_columns_invalid(shared_datadir, log_type, names):
+    with pytest.raises(ValueError):
+        next(AwsLogParser(log_type).read_columns(f"file://{shared_datadir}", names))
+
+
+@pytest.mark.parametrize("names", [None, ["action"]])
+def test_read_columns_waf(shared_datadir, names):
+    parser = AwsLogParser(LogType.WAF)
+    with pytest.raises(ValueError):
+        next(parser.read_columns(f"file://{shared_datadir / 'waf_log.json'}", names))
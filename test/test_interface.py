@@ -1,8 +1,12 @@
 import pytest
 import datetime
+import gzip
+import os
 
+from botocore.response import StreamingBody
 from dataclasses import dataclass
 from dateutil.tz import tzutc
+from io import BytesIO
 from pathlib import Path
 
 from aws_log_parser import (
@@ -11,6 +15,7 @@ from aws_log_parser import (
 )
 
 
+from aws_log_parser.aws import AwsClient
 from aws_log_parser.aws.s3 import S3Service
 
 
@@ -24,14 +29,18 @@ class MockPaginator:
             "Contents": [
                 {
                     "Key": f"cloudfront-multiple.log{suffix}",
-                    "LastModified": datetime.datetime(2021, 11, 28, 3, 31, 56, tzinfo=tzutc()),
+                    "LastModified": datetime.datetime(
+                        2021, 11, 28, 3, 31, 56, tzinfo=tzutc()
+                    ),
                     "ETag": '"37c13f9a66a79c2b474356adaf5da1d0"',
                     "Size": 2844,
                     "StorageClass": "STANDARD",
                 },
                 {
                     "Key": f"csv-file.csv{suffix}",
-                    "LastModified": datetime.datetime(2021, 11, 28, 3, 31, 56, tzinfo=tzutc()),
+                    "LastModified": datetime.datetime(
+                        2021, 11, 28, 3, 31, 56, tzinfo=tzutc()
+                    ),
                     "ETag": '"37c13f9a66a79c2b474356adaf555555"',
                     "Size": 2844,
                     "StorageClass": "STANDARD",
@@ -44,11 +53,14 @@ class MockPaginator:
 class MockStreamingFile:
     filename: str
 
-    def read(self):
-        return open(self.filename, "rb").read()
+    def __post_init__(self):
+        self.fh = open(self.filename, "rb")
 
-    def iter_lines(self):
-        yield from [line for line in open(self.filename, "rb")]
+    def read(self, amt=None):
+        return self.fh.read(amt)
+
+    def close(self):
+        self.fh.close()
 
 
 @dataclass
@@ -63,6 +75,14 @@ class MockS3Client:
         return {"Body": MockStreamingFile(f"test/data/cloudfront-multiple.log{suffix}")}
 
 
+@dataclass
+class MockBodyS3Client:
+    body: StreamingBody
+
+    def get_object(self, **_):
+        return {"Body": self.body}
+
+
 @pytest.fixture
 def cloudfront_parser():
     return AwsLogParser(
@@ -80,6 +100,23 @@ def test_regex_filter(monkeypatch):
     assert len(list(entries)) == 6
 
 
+@pytest.mark.parametrize("fetch_ordered", [True, False])
+def test_parse_s3_fetch_concurrency(monkeypatch, fetch_ordered):
+    monkeypatch.setattr(S3Service, "client", MockS3Client())
+    serial = AwsLogParser(log_type=LogType.CloudFront, file_suffix="").read_s3(
+        "bucket", "key"
+    )
+    concurrent = AwsLogParser(
+        log_type=LogType.CloudFront,
+        file_suffix="",
+        fetch_concurrency=2,
+        fetch_ordered=fetch_ordered,
+    ).read_s3("bucket", "key")
+    entries = list(concurrent)
+    assert len(entries) == 12
+    assert entries == list(serial)
+
+
 def test_parse_file(cloudfront_parser):
     entries = cloudfront_parser.read_file("test/data/cloudfront-multiple.log")
     assert len(list(entries)) == 6
@@ -95,6 +132,44 @@ def test_parse_files():
     assert len(list(entries)) == 4
 
 
+@pytest.mark.parametrize("fetch_ordered", [True, False])
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_parse_files_workers(fetch_ordered, chunksize):
+    kwargs = dict(log_type=LogType.LoadBalancer, regex_filter=r"^loadbalancer_.*\.csv$")
+    serial = list(AwsLogParser(**kwargs).read_files("test/data"))
+    assert len(serial) == 12
+    parallel = list(
+        AwsLogParser(
+            workers=2,
+            chunksize=chunksize,
+            fetch_ordered=fetch_ordered,
+            **kwargs,
+        ).read_files("test/data")
+    )
+    if fetch_ordered:
+        assert parallel == serial
+    else:
+        assert sorted(map(repr, parallel)) == sorted(map(repr, serial))
+
+
+def test_parse_s3_workers(monkeypatch):
+    monkeypatch.setattr(S3Service, "client", MockS3Client())
+    parser = AwsLogParser(log_type=LogType.CloudFront, file_suffix="", workers=2)
+    assert len(list(parser.read_s3("bucket", "key"))) == 12
+
+
+def worker_state(parser, batch):
+    return [(os.getpid(), id(parser), id(parser.aws_client.s3_service))]
+
+
+def test_parse_parallel_parser_per_process():
+    parser = AwsLogParser(log_type=LogType.CloudFront, workers=2)
+    states = list(parser.parse_parallel(worker_state, range(20)))
+    assert len(states) == 20
+    # Every process reuses the parser it was sent, and its AWS clients.
+    assert len(set(states)) == len({pid for pid, _, _ in states}) <= 2
+
+
 def test_parse_s3(monkeypatch, cloudfront_parser, gzipped=False):
     monkeypatch.setattr(S3Service, "client", MockS3Client(gzipped=gzipped))
     suffix = ".gz" if gzipped else ""
@@ -120,9 +195,34 @@ def test_parse_s3_gzipped(monkeypatch, cloudfront_parser):
     assert len(list(entries)) == 6
 
 
+@pytest.mark.parametrize(
+    "key", ["cloudfront-multiple.log", "cloudfront-multiple.log.gz"]
+)
+def test_read_key_streaming_body(monkeypatch, key):
+    path = Path(__file__).parent / "data" / key
+    raw = path.open("rb")
+    body = StreamingBody(raw, path.stat().st_size)
+    reads = []
+    read = raw.read
+
+    def record_read(amt=None):
+        reads.append(amt)
+        return read(amt)
+
+    monkeypatch.setattr(raw, "read", record_read)
+    monkeypatch.setattr(S3Service, "client", MockBodyS3Client(body))
+
+    s3_service = S3Service(aws_client=AwsClient())
+    assert len(list(s3_service.read_key("bucket", key))) == 8
+    assert None not in reads
+    assert raw.closed
+
+
 def test_parse_url_s3(monkeypatch, cloudfront_parser):
     monkeypatch.setattr(S3Service, "client", MockS3Client())
-    entries = cloudfront_parser.read_url("s3://aws-logs-test-data/cloudfront-multiple.log")
+    entries = cloudfront_parser.read_url(
+        "s3://aws-logs-test-data/cloudfront-multiple.log"
+    )
     assert len(list(entries)) == 6
 
 
@@ -133,6 +233,115 @@ def test_parse_url_file(cloudfront_parser):
     assert len(list(entries)) == 6
 
 
+def test_parse_url_fields(cloudfront_parser):
+    entries = list(
+        cloudfront_parser.read_url(
+            f"file://{Path(__file__).parent}/data/cloudfront-multiple.log",
+            fields=["client_ip"],
+        )
+    )
+    assert len(entries) == 6
+    assert {entry.client_ip for entry in entries} == {"128.92.136.19", "192.0.2.200"}
+    assert {entry.uri_stem for entry in entries} == {None}
+    assert cloudfront_parser.fields is None
+
+
 def test_parse_url_gopher(cloudfront_parser):
     with pytest.raises(ValueError):
         list(cloudfront_parser.read_url("gopher://"))
+
+
+def test_parse_files_workers_mmap(tmp_path):
+    line = Path("test/data/loadbalancer_http_entry.csv").read_text()
+    # Large enough to be split in byte ranges between the workers.
+    (tmp_path / "big.log").write_text(line * 6000)
+    (tmp_path / "small.log").write_text(line)
+    kwargs = dict(log_type=LogType.LoadBalancer, mmap=True)
+    serial = list(AwsLogParser(**kwargs).read_files(tmp_path))
+    assert len(serial) == 6001
+    parser = AwsLogParser(workers=2, **kwargs)
+    assert len(list(parser.list_ranges(parser.list_paths(tmp_path)))) == 3
+    assert sorted(map(repr, parser.read_files(tmp_path))) == sorted(map(repr, serial))
+
+
+@dataclass
+class MockRangeS3Client:
+    data: bytes
+    ranges: list
+
+    def get_paginator(self, *_):
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {"Contents": [{"Key": Prefix, "LastModified": 0}]}
+
+    def get_object(self, Bucket, Key, Range=None):
+        self.ranges.append(Range)
+        start = int(Range[len("bytes=") : -1]) if Range else 0
+        return {"Body": MockStreamingBody(self.data[start:])}
+
+
+@dataclass
+class MockStreamingBody:
+    data: bytes
+
+    def __post_init__(self):
+        self.fh = BytesIO(self.data)
+
+    def read(self, amt=None):
+        return self.fh.read(amt)
+
+    def close(self):
+        self.fh.close()
+
+
+def big_log(gzipped):
+    lines = Path("test/data/loadbalancer_http_entry.csv").read_text() * 2000
+    data = lines.encode("utf-8")
+    if gzipped:
+        # A member per 500 lines.
+        size = len(data) // 4
+        data = b"".join(
+            gzip.compress(data[i : i + size]) for i in range(0, len(data), size)
+        )
+    return data
+
+
+def assert_resumed(parser, url, resume_at=1):
+    batches = list(parser.read_batches(url))
+    assert len(batches) > 2
+    entries = [entry for batch, _ in batches for entry in batch]
+    assert entries == list(parser.read_url(url))
+    _, offset = batches[resume_at]
+    rest = [entry for batch, _ in batches[resume_at + 1 :] for entry in batch]
+    resumed = [
+        entry for batch, _ in parser.read_batches(url, offset) for entry in batch
+    ]
+    assert resumed == rest
+    return offset
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+@pytest.mark.parametrize("gzipped", [False, True])
+def test_read_batches_file(tmp_path, gzipped, mmap):
+    path = tmp_path / ("big.log.gz" if gzipped else "big.log")
+    path.write_bytes(big_log(gzipped))
+    parser = AwsLogParser(LogType.LoadBalancer, mmap=mmap)
+    assert_resumed(parser, f"file://{path}")
+
+
+@pytest.mark.parametrize("gzipped", [False, True])
+def test_read_batches_s3_range(monkeypatch, gzipped):
+    client = MockRangeS3Client(big_log(gzipped), [])
+    monkeypatch.setattr(S3Service, "client", client)
+    parser = AwsLogParser(LogType.LoadBalancer, file_suffix="")
+    key = "big.log.gz" if gzipped else "big.log"
+    offset = assert_resumed(parser, f"s3://bucket/{key}", resume_at=2)
+    assert offset.offset
+    assert client.ranges[-1] == f"bytes={offset.offset}-"
+
+
+def test_read_batches_json(shared_datadir):
+    parser = AwsLogParser(LogType.WAF)
+    with pytest.raises(ValueError):
+        list(parser.read_batches(f"file://{shared_datadir / 'waf_log.json'}"))
@@ -1,5 +1,10 @@
+import gzip
+import json
+import pytest
+
 from io import BytesIO
 from pathlib import Path
+from aws_log_parser import io
 from aws_log_parser.io import FileIterator
 
 
@@ -24,3 +29,209 @@ def test_fileiterator_gzipped_fileobj():
         gzipped=True,
     )
     assert len(list(file_iterator)) == 1
+
+
+def gzip_lines(lines, members=1):
+    size = len(lines) // members
+    return b"".join(
+        gzip.compress("".join(lines[i : i + size]).encode("utf-8"))
+        for i in range(0, len(lines), size)
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 256])
+@pytest.mark.parametrize("members", [1, 3])
+def test_fileiterator_gzipped_chunked(chunk_size, members):
+    lines = [f"line {i} éé\r\n" for i in range(99)]
+    file_iterator = FileIterator(
+        fileobj=BytesIO(gzip_lines(lines, members) + b"\x00" * 8),
+        gzipped=True,
+        chunk_size=chunk_size,
+    )
+    assert list(file_iterator) == [line.rstrip() for line in lines]
+
+
+def test_fileiterator_gzipped_no_trailing_newline():
+    file_iterator = FileIterator(
+        fileobj=BytesIO(gzip.compress(b"first\nlast")),
+        gzipped=True,
+        chunk_size=3,
+    )
+    assert list(file_iterator) == ["first", "last"]
+
+
+def test_fileiterator_gzipped_truncated():
+    data = gzip.compress(b"line\n" * 1000)
+    file_iterator = FileIterator(fileobj=BytesIO(data[:-20]), gzipped=True)
+    with pytest.raises(EOFError):
+        list(file_iterator)
+
+
+JSON_OBJECTS = [
+    {"id": i, "text": "é{}\n", "nested": {"list": [i, "]"]}} for i in range(50)
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1024 * 256])
+@pytest.mark.parametrize("separator", ["", "\n", " \r\n "])
+@pytest.mark.parametrize("gzipped", [False, True])
+def test_fileiterator_json_objects(chunk_size, separator, gzipped):
+    data = separator.join(
+        json.dumps(obj, ensure_ascii=False, indent=1 if separator == "\n" else None)
+        for obj in JSON_OBJECTS
+    ).encode("utf-8")
+    file_iterator = FileIterator(
+        fileobj=BytesIO(gzip.compress(data) if gzipped else data),
+        gzipped=gzipped,
+        chunk_size=chunk_size,
+        json_objects=True,
+    )
+    assert list(file_iterator) == JSON_OBJECTS
+
+
+def test_fileiterator_json_objects_incremental():
+    file_iterator = iter(
+        FileIterator(
+            fileobj=BytesIO(b'{"a": 1}{"b": 2}{"c": '), chunk_size=9, json_objects=True
+        )
+    )
+    assert next(file_iterator) == {"a": 1}
+    assert next(file_iterator) == {"b": 2}
+    with pytest.raises(ValueError):
+        next(file_iterator)
+
+
+def test_fileiterator_json_objects_bounded(monkeypatch):
+    monkeypatch.setattr(io, "MAX_JSON_OBJECT_SIZE", 16)
+    file_iterator = FileIterator(
+        fileobj=BytesIO(b'{"a": "' + b"x" * 64 + b'"}'), chunk_size=8, json_objects=True
+    )
+    with pytest.raises(ValueError):
+        list(file_iterator)
+
+
+MAPPED_CONTENTS = [
+    b"",
+    b"no newline",
+    b"\n\nempty lines\n",
+    "line é\r\n".encode("utf-8") * 20 + b"last",
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024 * 256])
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("content", MAPPED_CONTENTS)
+def test_fileiterator_mmap(tmp_path, content, binary, chunk_size):
+    path = tmp_path / "file.log"
+    path.write_bytes(content)
+    file_iterator = FileIterator(path, mmap=True, binary=binary, chunk_size=chunk_size)
+    assert list(file_iterator) == list(FileIterator(path, binary=binary))
+
+
+@pytest.mark.parametrize("parts", [2, 3, 50])
+@pytest.mark.parametrize("content", MAPPED_CONTENTS)
+def test_fileiterator_mmap_ranges(tmp_path, content, parts):
+    path = tmp_path / "file.log"
+    path.write_bytes(content)
+    lines = [
+        line
+        for start, end in io.byte_ranges(len(content), parts, min_size=1)
+        for line in FileIterator(path, mmap=True, start=start, end=end, chunk_size=5)
+    ]
+    assert lines == list(FileIterator(path))
+
+
+def test_fileiterator_mmap_json_objects(tmp_path):
+    path = tmp_path / "file.json"
+    path.write_text("".join(json.dumps(obj) for obj in JSON_OBJECTS))
+    file_iterator = FileIterator(path, mmap=True, json_objects=True, chunk_size=7)
+    assert list(file_iterator) == JSON_OBJECTS
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"mmap": True, "gzipped": True}, {"mmap": True, "json_objects": True}, {}],
+)
+def test_fileiterator_ranges_invalid(options):
+    with pytest.raises(ValueError):
+        FileIterator(Path("test/data/cloudfront-multiple.log"), end=10, **options)
+
+
+def test_byte_ranges():
+    assert io.byte_ranges(10, 3, min_size=1) == [(0, 4), (4, 8), (8, 10)]
+    assert io.byte_ranges(10, 3, min_size=4) == [(0, 5), (5, 10)]
+    assert io.byte_ranges(10, 3) == [(0, 10)]
+
+
+RESUMED_LINES = [f"line {i} éé\r\n" for i in range(99)]
+
+
+def assert_resumable(path, lines, **options):
+    batches = list(FileIterator(path, **options).batches())
+    assert [line for batch, _ in batches for line in batch] == lines
+    for index, (_, offset) in enumerate(batches):
+        rest = [line for batch, _ in batches[index + 1 :] for line in batch]
+        assert list(FileIterator(path, resume_from=offset, **options)) == rest
+    return [offset for _, offset in batches]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024 * 256])
+@pytest.mark.parametrize("mmap", [False, True])
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("content", MAPPED_CONTENTS)
+def test_fileiterator_resume_plain(tmp_path, content, mmap, binary, chunk_size):
+    path = tmp_path / "file.log"
+    path.write_bytes(content)
+    offsets = assert_resumable(
+        path,
+        list(FileIterator(path, binary=binary)),
+        mmap=mmap,
+        binary=binary,
+        chunk_size=chunk_size,
+    )
+    assert all(offset.lines == 0 for offset in offsets)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024 * 256])
+@pytest.mark.parametrize("members", [1, 3])
+def test_fileiterator_resume_gzipped(tmp_path, chunk_size, members):
+    path = tmp_path / "file.log.gz"
+    path.write_bytes(gzip_lines(RESUMED_LINES, members))
+    offsets = assert_resumable(
+        path,
+        [line.rstrip() for line in RESUMED_LINES],
+        gzipped=True,
+        chunk_size=chunk_size,
+    )
+    # Resumed from the start of the members.
+    assert len({offset.offset for offset in offsets}) == members
+
+
+def test_fileiterator_resume_gzipped_member_within_line(tmp_path):
+    path = tmp_path / "file.log.gz"
+    path.write_bytes(gzip.compress(b"first\nsec") + gzip.compress(b"ond\nlast\n"))
+    offsets = assert_resumable(
+        path, ["first", "second", "last"], gzipped=True, chunk_size=4
+    )
+    # The second member starts within a line.
+    assert {offset.offset for offset in offsets} == {0}
+
+
+def test_fileiterator_resume_fileobj():
+    content = "".join(RESUMED_LINES).encode("utf-8")
+    offset = io.FileOffset(content.index(b"line 50"))
+    file_iterator = FileIterator(
+        fileobj=BytesIO(content[offset.offset :]), resume_from=offset, chunk_size=7
+    )
+    assert list(file_iterator) == [line.rstrip() for line in RESUMED_LINES[50:]]
+    batches = FileIterator(
+        fileobj=BytesIO(content[offset.offset :]), resume_from=offset
+    )
+    assert list(batches.batches())[-1][1] == io.FileOffset(len(content))
+
+
+def test_fileiterator_resume_json_objects(tmp_path):
+    with pytest.raises(ValueError):
+        FileIterator(Path("test/data/waf_log.json"), json_objects=True, resume_from=1)
+    with pytest.raises(ValueError):
+        list(FileIterator(Path("test/data/waf_log.json"), json_objects=True).batches())
@@ -1,9 +1,11 @@
 import datetime
 import dataclasses
+import pytest
 
 
 from .conftest import parse_entry
 
+from aws_log_parser import AwsLogParser
 from aws_log_parser.models import (
     CloudFrontWebDistributionLogEntry,
     LogType,
@@ -76,3 +78,21 @@ def test_cloudfront_entry2(
     )
     entry = parse_entry(cloudfront_entry2, LogType.CloudFront)
     assert entry == cloudfront_log_entry2
+
+
+@pytest.mark.parametrize(
+    "since,until,expected",
+    [
+        (datetime.datetime(2019, 12, 13), None, 3),
+        (datetime.datetime(2019, 12, 13, 22, 36, 27), None, 2),
+        (None, datetime.datetime(2019, 12, 13, 22, 36, 27), 4),
+    ],
+)
+@pytest.mark.parametrize("fields", [None, ["status_code"]])
+def test_cloudfront_window(shared_datadir, since, until, expected, fields):
+    url = f"file://{shared_datadir / 'cloudfront-multiple.log'}"
+    parser = AwsLogParser(LogType.CloudFront, fields=fields)
+    entries = list(parser.read_url(url, since=since, until=until))
+    assert len(entries) == expected
+    # The parser's own window is left as is.
+    assert len(list(parser.read_url(url))) == 6
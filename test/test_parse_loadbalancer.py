@@ -2,6 +2,8 @@ import dataclasses
 import datetime
 import pytest
 
+from pathlib import Path
+
 from aws_log_parser.models import (
     Host,
     HttpRequest,
@@ -13,6 +15,8 @@ from aws_log_parser.models import (
 )
 
 
+from aws_log_parser import AwsLogParser
+
 from .conftest import parse_entry
 
 
@@ -546,3 +550,182 @@ def test_classic_loadbalancer_http_entry(classic_loadbalancer_http_entry):
         ssl_cipher="DHE-RSA-AES128-SHA",
         ssl_protocol="TLSv1.2",
     )
+
+
+def test_loadbalancer_fields(
+    base_load_balancer_log_entry, loadbalancer_cloudfront_forward_h2
+):
+    fields = ["timestamp", "client", "elb_status_code", "target_processing_time"]
+    entry = next(
+        AwsLogParser(LogType.LoadBalancer, fields=fields).parse(
+            loadbalancer_cloudfront_forward_h2
+        )
+    )
+    for field in dataclasses.fields(entry):
+        expected = (
+            getattr(base_load_balancer_log_entry, field.name)
+            if field.name in fields
+            else None
+        )
+        assert getattr(entry, field.name) == expected
+
+
+def test_loadbalancer_unknown_fields(loadbalancer_http_entry):
+    with pytest.raises(ValueError):
+        list(
+            AwsLogParser(LogType.LoadBalancer, fields=["status"]).parse(
+                loadbalancer_http_entry
+            )
+        )
+
+
+@pytest.fixture
+def loadbalancer_entries(shared_datadir):
+    return [
+        (shared_datadir / name).read_text()
+        for name in [
+            "loadbalancer_http_entry.csv",
+            "loadbalancer_https_entry.csv",
+            "loadbalancer_lambda_failed_entry.csv",
+            "loadbalancer_cloudfront_forward_refused.csv",
+            "loadbalancer_http2_entry_auth_error.csv",
+        ]
+    ]
+
+
+@pytest.mark.parametrize(
+    "filters,expected",
+    [
+        ([("elb_status_code", ">=", 500)], [502, 502]),
+        ([("elb_status_code", "in", {401, 502})], [502, 502, 401]),
+        ([("domain_name", "==", "example.com")], [401]),
+        ([("domain_name", "!=", "example.com")], [200, 200, 502, 502]),
+        ([("target_status_code", "<", 300)], [200, 200]),
+        (
+            [
+                (
+                    "timestamp",
+                    ">=",
+                    datetime.datetime(2018, 11, 1, tzinfo=datetime.timezone.utc),
+                ),
+                ("elb_status_code", "!=", 200),
+            ],
+            [502, 502],
+        ),
+        # Naive datetimes are in UTC.
+        ([("timestamp", "<", datetime.datetime(2018, 11, 1))], [200, 200, 401]),
+        (
+            [("timestamp", "in", {datetime.datetime(2018, 11, 30, 22, 23, 0, 186641)})],
+            [502, 502],
+        ),
+    ],
+)
+def test_loadbalancer_filters(loadbalancer_entries, filters, expected):
+    entries = AwsLogParser(LogType.LoadBalancer, filters=filters).parse(
+        loadbalancer_entries
+    )
+    assert [entry.elb_status_code for entry in entries] == expected
+
+
+def test_loadbalancer_filters_with_fields(loadbalancer_entries):
+    entries = AwsLogParser(
+        LogType.LoadBalancer,
+        fields=["client"],
+        filters=[("elb_status_code", "==", 401)],
+    ).parse(loadbalancer_entries)
+    assert [entry.elb_status_code for entry in entries] == [None]
+
+
+@pytest.mark.parametrize(
+    "since,until,expected",
+    [
+        (
+            datetime.datetime(2018, 11, 1, tzinfo=datetime.timezone.utc),
+            None,
+            [502, 502],
+        ),
+        (None, datetime.datetime(2018, 11, 1), [200, 200, 401]),
+        (
+            datetime.datetime(2018, 7, 2, 22, 23, 0, 186641),
+            datetime.datetime(2018, 11, 30, 22, 23, 0, 186641),
+            [200, 200, 401],
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "tokenizer,fields", [("csv", None), ("bytes", ["elb_status_code"]), ("elb", None)]
+)
+def test_loadbalancer_window(
+    loadbalancer_entries, since, until, expected, tokenizer, fields
+):
+    entries = AwsLogParser(
+        LogType.LoadBalancer,
+        since=since,
+        until=until,
+        tokenizer=tokenizer,
+        fields=fields,
+    ).parse(loadbalancer_entries)
+    assert [entry.elb_status_code for entry in entries] == expected
+
+
+@pytest.mark.parametrize(
+    "filters", [[("status", "==", 200)], [("elb_status_code", "~", 200)]]
+)
+def test_loadbalancer_invalid_filters(loadbalancer_entries, filters):
+    with pytest.raises(ValueError):
+        list(
+            AwsLogParser(LogType.LoadBalancer, filters=filters).parse(
+                loadbalancer_entries
+            )
+        )
+
+
+LOADBALANCER_FIXTURES = sorted(
+    path.name for path in (Path(__file__).parent / "data").glob("*loadbalancer_*.csv")
+)
+
+
+@pytest.mark.parametrize(
+    "fields", [None, ["timestamp", "client", "elb_status_code"], ["user_agent"]]
+)
+@pytest.mark.parametrize("fixture_name", LOADBALANCER_FIXTURES)
+def test_loadbalancer_elb_tokenizer(shared_datadir, fixture_name, fields):
+    log_type = (
+        LogType.ClassicLoadBalancer
+        if fixture_name.startswith("classic")
+        else LogType.LoadBalancer
+    )
+    content = (shared_datadir / fixture_name).read_text().splitlines()
+    expected = list(AwsLogParser(log_type, fields=fields).parse(content))
+    entries = AwsLogParser(log_type, fields=fields, tokenizer="elb").parse(content)
+    assert list(entries) == expected
+
+
+@pytest.mark.parametrize("fixture_name", LOADBALANCER_FIXTURES)
+def test_loadbalancer_elb_tokenizer_lazy_fields(shared_datadir, fixture_name):
+    log_type = (
+        LogType.ClassicLoadBalancer
+        if fixture_name.startswith("classic")
+        else LogType.LoadBalancer
+    )
+    content = (shared_datadir / fixture_name).read_text().splitlines()
+    expected = list(AwsLogParser(log_type).parse(content))
+    entries = AwsLogParser(
+        log_type, tokenizer="elb", lazy=True, fields=["elb", "client"]
+    ).parse(content)
+    # Fields outside of the projection are still decoded on access.
+    assert [
+        (entry.timestamp, entry.elb_status_code, entry.http_request)
+        for entry in entries
+    ] == [
+        (entry.timestamp, entry.elb_status_code, entry.http_request)
+        for entry in expected
+    ]
+
+
+def test_loadbalancer_elb_tokenizer_filters(loadbalancer_entries):
+    filters = [("elb_status_code", "in", {401, 502})]
+    entries = AwsLogParser(
+        LogType.LoadBalancer, filters=filters, tokenizer="elb"
+    ).parse(loadbalancer_entries)
+    assert [entry.elb_status_code for entry in entries] == [502, 502, 401]
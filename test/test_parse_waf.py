@@ -1,7 +1,15 @@
+import dataclasses
 import datetime
+import gzip
+import json
 import pytest
 import typing
 
+from dataclasses import MISSING
+
+from aws_log_parser import AwsLogParser, interface
+from aws_log_parser.parser import json_decoder
+
 from .conftest import parse_entry
 
 from aws_log_parser.models import (
@@ -92,3 +100,124 @@ def test_waf_entry(waf_entry_json, base_waf_entry):
     waf_entry = typing.cast(WafLogEntry, parse_entry([waf_entry_json], LogType.WAF))
     assert isinstance(waf_entry.timestamp, datetime.datetime) is True
     assert waf_entry == base_waf_entry
+
+
+@pytest.mark.parametrize("action,count", [("ALLOW", 1), ("BLOCK", 0)])
+def test_waf_filters(waf_entry_json, action, count):
+    entries = AwsLogParser(LogType.WAF, filters=[("action", "==", action)]).parse(
+        [waf_entry_json]
+    )
+    assert len(list(entries)) == count
+
+
+@pytest.mark.parametrize(
+    "since,until,count",
+    [
+        (datetime.datetime(2018, 8, 8), None, 1),
+        (None, datetime.datetime(2018, 8, 8), 0),
+        (datetime.datetime(2018, 8, 8, 0, 45), None, 0),
+    ],
+)
+def test_waf_window(waf_entry_json, since, until, count):
+    entries = AwsLogParser(LogType.WAF, since=since, until=until).parse(
+        [waf_entry_json]
+    )
+    assert len(list(entries)) == count
+
+
+def test_waf_records(waf_entry_json, base_waf_entry):
+    record = next(
+        AwsLogParser(LogType.WAF, record_type="namedtuple").parse([waf_entry_json])
+    )
+    assert record.action == "ALLOW"
+    assert record == tuple(
+        getattr(base_waf_entry, waf_field.name)
+        for waf_field in dataclasses.fields(WafLogEntry)
+    )
+
+
+def set_path(record, path, value):
+    *parents, name = path
+    for parent in parents:
+        record = record[parent]
+    if value is MISSING:
+        del record[name]
+    else:
+        record[name] = value
+
+
+@pytest.mark.parametrize(
+    "path,value",
+    [
+        (["formatVersion"], "2"),
+        (["httpSourceId"], 5),
+        (["httpRequest"], None),
+        (["httpRequest", "headers"], None),
+        (["ruleGroupList"], None),
+        (["ruleGroupList"], [None]),
+        (["ruleGroupList", 0, "terminatingRule"], {"ruleId": "x"}),
+        (["rateBasedRuleList", 0, "maxRateAllowed"], "7"),
+        (["rateBasedRuleList"], MISSING),
+        (["labels"], [{"name": "awswaf:managed"}]),
+    ],
+)
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_waf_json_decoder(waf_entry_json, path, value):
+    record = json.loads(waf_entry_json)
+    set_path(record, path, value)
+    expected = WafLogEntry.from_dict(record)
+    entry = json_decoder(WafLogEntry)(record)
+    assert entry == expected
+    assert repr(entry) == repr(expected)
+
+
+def test_waf_json_decoder_missing(waf_entry_json):
+    record = json.loads(waf_entry_json)
+    del record["httpSourceId"]
+    with pytest.raises(KeyError):
+        json_decoder(WafLogEntry)(record)
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_waf_json_loads(monkeypatch, waf_entry_json, base_waf_entry, backend):
+    monkeypatch.setattr(interface, "json_loads", pytest.importorskip(backend).loads)
+    (entry,) = AwsLogParser(LogType.WAF).parse([waf_entry_json.encode()])
+    assert entry == base_waf_entry
+
+
+def test_waf_slots(waf_entry_json, base_waf_entry):
+    (entry,) = AwsLogParser(LogType.WAF, slots=True).parse([waf_entry_json])
+    assert not hasattr(entry, "__dict__")
+    assert dataclasses.astuple(entry) == dataclasses.astuple(base_waf_entry)
+    assert entry.client_ip == "192.10.23.23"
+
+
+def test_waf_slots_workers(tmp_path, waf_entry_json, base_waf_entry):
+    log_dir = tmp_path / "waf"
+    log_dir.mkdir()
+    for name in ("a.log", "b.log"):
+        (log_dir / name).write_text(waf_entry_json)
+    parser = AwsLogParser(LogType.WAF, slots=True, workers=2)
+    entries = list(parser.read_url(f"file://{log_dir}"))
+    assert len(entries) == 2
+    assert all(
+        dataclasses.astuple(entry) == dataclasses.astuple(base_waf_entry)
+        for entry in entries
+    )
+
+
+@pytest.mark.parametrize("gzipped", [False, True])
+def test_waf_read_concatenated(tmp_path, waf_entry_json, base_waf_entry, gzipped):
+    # Firehose delivers objects back to back without newlines.
+    data = (json.dumps(json.loads(waf_entry_json)) * 3).encode()
+    path = tmp_path / ("waf.log.gz" if gzipped else "waf.log")
+    path.write_bytes(gzip.compress(data) if gzipped else data)
+    entries = list(AwsLogParser(LogType.WAF).read_url(f"file://{path}"))
+    assert entries == [base_waf_entry] * 3
+
+
+def test_waf_read_pretty_printed(shared_datadir, base_waf_entry):
+    entries = list(
+        AwsLogParser(LogType.WAF).read_url(f"file://{shared_datadir}/waf_log.json")
+    )
+    assert entries == [base_waf_entry]
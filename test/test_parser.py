@@ -0,0 +1,355 @@
+import csv
+import dataclasses
+import datetime
+import pickle
+import pytest
+
+from dataclasses import fields
+
+from aws_log_parser import AwsLogParser
+from aws_log_parser.models import LogType, record_model, slotted_model
+from aws_log_parser import parser
+from aws_log_parser.parser import (
+    InternPool,
+    model_converters,
+    nullable_str,
+    to_datetime,
+    to_datetime_fixed,
+    to_python,
+)
+
+
+@pytest.mark.parametrize(
+    "log_type,fixture_name",
+    [
+        (LogType.ClassicLoadBalancer, "classic_loadbalancer_http_entry.csv"),
+        (LogType.LoadBalancer, "loadbalancer_http_entry.csv"),
+        (LogType.LoadBalancer, "loadbalancer_http2_entry_auth_error.csv"),
+        (LogType.LoadBalancer, "loadbalancer_lambda_failed_entry.csv"),
+        (LogType.CloudFront, "cloudfront_entry2.csv"),
+        (LogType.CloudFront, "cloudfront_entry_cookie_with_encoding.csv"),
+    ],
+)
+def test_model_converters_match_to_python(shared_datadir, log_type, fixture_name):
+    with (shared_datadir / fixture_name).open() as fh:
+        row = next(csv.reader(fh, delimiter=log_type.delimiter))
+
+    converters = model_converters(log_type.model)
+    model_fields = fields(log_type.model)
+    assert len(converters) == len(model_fields)
+    assert [converter(value) for converter, value in zip(converters, row)] == [
+        to_python(value, field) for value, field in zip(row, model_fields)
+    ]
+
+
+def test_model_converters_cached():
+    model = LogType.LoadBalancer.model
+    assert model_converters(model) is model_converters(model)
+
+
+@pytest.mark.parametrize(
+    "log_type,fixture_name",
+    [
+        (LogType.ClassicLoadBalancer, "classic_loadbalancer_http_entry.csv"),
+        (LogType.LoadBalancer, "loadbalancer_http2_entry_auth_error.csv"),
+        (LogType.CloudFront, "cloudfront_entry2.csv"),
+        (LogType.CloudFront, "cloudfront-multiple.log"),
+    ],
+)
+def test_lazy_entries_match(shared_datadir, log_type, fixture_name):
+    content = (shared_datadir / fixture_name).read_text().splitlines()
+    eager = list(AwsLogParser(log_type).parse(content))
+    lazy = list(AwsLogParser(log_type, lazy=True).parse(content))
+    assert len(lazy) == len(eager)
+    for lazy_entry, entry in zip(lazy, eager):
+        assert isinstance(lazy_entry, log_type.model)
+        assert dataclasses.asdict(lazy_entry) == dataclasses.asdict(entry)
+        assert lazy_entry == entry
+        assert entry == lazy_entry
+
+
+def test_lazy_entry_decodes_on_access(loadbalancer_http_entry):
+    entry = next(
+        AwsLogParser(LogType.LoadBalancer, lazy=True).parse(loadbalancer_http_entry)
+    )
+    assert "http_request" not in entry.__dict__
+    assert entry.elb_status_code == 200
+    assert "http_request" not in entry.__dict__
+    assert entry.http_request.path == "/"
+    assert entry.__dict__["http_request"] is entry.http_request
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        entry.elb_status_code = 500
+
+
+def test_lazy_entry_pickle(loadbalancer_http_entry):
+    entry = next(
+        AwsLogParser(LogType.LoadBalancer, lazy=True).parse(loadbalancer_http_entry)
+    )
+    unpickled = pickle.loads(pickle.dumps(entry))
+    assert type(unpickled) is type(entry)
+    assert unpickled == entry
+
+
+def test_lazy_entry_replace(loadbalancer_http_entry):
+    content = list(loadbalancer_http_entry)
+    entry = next(AwsLogParser(LogType.LoadBalancer, lazy=True).parse(content))
+    eager = next(AwsLogParser(LogType.LoadBalancer).parse(content))
+    replaced = dataclasses.replace(entry, elb_status_code=500)
+    assert replaced.elb_status_code == 500
+    assert replaced == dataclasses.replace(eager, elb_status_code=500)
+    assert replaced != entry
+    assert pickle.loads(pickle.dumps(replaced)) == replaced
+    assert type(entry).__module__ == "aws_log_parser.parser"
+
+
+def legacy_to_datetime(value):
+    return datetime.datetime.fromisoformat(value.rstrip("Z")).replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2018-07-02T22:23:00.186641Z",
+        "2015-05-13T23:39:43.000001Z",
+        "2024-12-31T23:59:59.999999Z",
+        "2018-07-02T22:22:48.364000Z",
+    ],
+)
+def test_to_datetime(value):
+    expected = legacy_to_datetime(value)
+    assert to_datetime(value) == expected
+    assert to_datetime(value).tzinfo == datetime.timezone.utc
+    assert to_datetime_fixed(value) == expected
+
+
+@pytest.mark.parametrize("value", ["2018-07-02T22:23:00Z", "2018-07-02T22:23:00.186"])
+def test_to_datetime_other_layouts(value):
+    assert to_datetime(value) == legacy_to_datetime(value)
+
+
+def test_to_datetime_fixed_cache_bounded(monkeypatch):
+    monkeypatch.setattr(parser, "MINUTE_CACHE_SIZE", 2)
+    monkeypatch.setattr(parser, "minute_cache", {})
+    for minute in range(5):
+        to_datetime_fixed(f"2018-07-02T22:{minute:02}:00.000000Z")
+    assert len(parser.minute_cache) <= 2
+
+
+def test_cloudfront_timestamp_cached(cloudfront_entry):
+    entry = next(AwsLogParser(LogType.CloudFront).parse(cloudfront_entry))
+    assert entry.timestamp == datetime.datetime(
+        2014, 5, 23, 1, 13, 11, tzinfo=datetime.timezone.utc
+    )
+    assert entry.timestamp is entry.timestamp
+
+
+def test_intern_pool_bounded():
+    pool = InternPool(2)
+    convert = pool.wrap(nullable_str)
+    values = ["".join(["a", str(i % 3)]) for i in range(6)]
+    assert [convert(value) for value in values] == values
+    assert sorted(pool.values) == ["a0", "a1"]
+    assert convert("".join(["a", "0"])) is pool.values["a0"]
+    assert convert("-") is None
+
+
+def test_interned_fields(shared_datadir):
+    content = (shared_datadir / "cloudfront-multiple.log").read_text().splitlines()
+    entries = list(AwsLogParser(LogType.CloudFront).parse(content))
+    for name in LogType.CloudFront.interned:
+        values = [getattr(entry, name) for entry in entries[:3]]
+        assert values[0] is values[1] is values[2]
+
+
+def test_memoize(shared_datadir):
+    content = [(shared_datadir / "loadbalancer_http_entry.csv").read_text()] * 3 + [
+        (shared_datadir / "loadbalancer_https_entry.csv").read_text()
+    ]
+    aws_log_parser = AwsLogParser(LogType.LoadBalancer, memoize=True)
+    entries = list(aws_log_parser.parse(content))
+    assert entries == list(AwsLogParser(LogType.LoadBalancer).parse(content))
+    assert entries[0].http_request is entries[2].http_request
+    assert entries[0].client is entries[1].client
+
+    cache_info = aws_log_parser.cache_info()
+    assert cache_info["http_request"].hits == 2
+    assert cache_info["http_request"].misses == 2
+    assert cache_info["host"].misses == 2
+    assert cache_info["host"].hits == 6
+
+
+def test_memoize_disabled():
+    assert AwsLogParser(LogType.LoadBalancer).cache_info() == {}
+
+
+def test_memoize_pickle():
+    aws_log_parser = AwsLogParser(LogType.LoadBalancer, memoize=True, memoize_size=8)
+    unpickled = pickle.loads(pickle.dumps(aws_log_parser))
+    assert unpickled.cache_info()["host"].maxsize == 8
+
+
+def test_memoize_read_url_overrides(shared_datadir):
+    aws_log_parser = AwsLogParser(LogType.LoadBalancer, memoize=True)
+    url = f"file://{shared_datadir / 'loadbalancer_http_entry.csv'}"
+    for _ in range(2):
+        assert len(list(aws_log_parser.read_url(url, fields=["http_request"]))) == 1
+    cache_info = aws_log_parser.cache_info()
+    assert cache_info["http_request"].misses == 1
+    assert cache_info["http_request"].hits == 1
+
+
+@pytest.mark.parametrize(
+    "log_type,fixture_name",
+    [
+        (LogType.ClassicLoadBalancer, "classic_loadbalancer_http_entry.csv"),
+        (LogType.LoadBalancer, "loadbalancer_http_entry.csv"),
+        (LogType.CloudFront, "cloudfront_entry2.csv"),
+    ],
+)
+@pytest.mark.parametrize("memoize", [False, True])
+def test_slotted_parity(shared_datadir, log_type, fixture_name, memoize):
+    content = (shared_datadir / fixture_name).read_text().splitlines()
+    expected = list(AwsLogParser(log_type).parse(content))
+    entries = list(AwsLogParser(log_type, slots=True, memoize=memoize).parse(content))
+    assert [dataclasses.astuple(entry) for entry in entries] == [
+        dataclasses.astuple(entry) for entry in expected
+    ]
+    for entry in entries:
+        assert not hasattr(entry, "__dict__")
+        assert type(entry) is slotted_model(log_type.model)
+        assert pickle.loads(pickle.dumps(entry)) == entry
+
+
+def test_slotted_plugin_attributes(shared_datadir):
+    content = (shared_datadir / "loadbalancer_http_entry.csv").read_text().splitlines()
+    entry = next(AwsLogParser(LogType.LoadBalancer, slots=True).parse(content))
+    object.__setattr__(entry, "instance_id", "i-0123456789abcdef0")
+    object.__setattr__(entry, "instance_name", "web")
+    assert (entry.instance_id, entry.instance_name) == ("i-0123456789abcdef0", "web")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        entry.elb = None
+
+
+def test_slotted_cloudfront_timestamp(cloudfront_entry):
+    entry = next(AwsLogParser(LogType.CloudFront, slots=True).parse(cloudfront_entry))
+    assert entry.timestamp == datetime.datetime(
+        2014, 5, 23, 1, 13, 11, tzinfo=datetime.timezone.utc
+    )
+    assert entry.timestamp is entry.timestamp
+
+
+@pytest.mark.parametrize(
+    "log_type,fixture_name",
+    [
+        (LogType.ClassicLoadBalancer, "classic_loadbalancer_http_entry.csv"),
+        (LogType.LoadBalancer, "loadbalancer_http_entry.csv"),
+        (LogType.CloudFront, "cloudfront_entry2.csv"),
+    ],
+)
+@pytest.mark.parametrize("record_type", ["tuple", "namedtuple"])
+def test_records(shared_datadir, log_type, fixture_name, record_type):
+    content = (shared_datadir / fixture_name).read_text().splitlines()
+    expected = [
+        tuple(getattr(entry, model_field.name) for model_field in fields(entry))
+        for entry in AwsLogParser(log_type).parse(content)
+    ]
+    records = list(AwsLogParser(log_type, record_type=record_type).parse(content))
+    assert records == expected
+    if record_type == "namedtuple":
+        assert all(type(record) is record_model(log_type.model) for record in records)
+        assert records[0]._fields == tuple(f.name for f in fields(log_type.model))
+        assert pickle.loads(pickle.dumps(records)) == records
+
+
+def test_records_fields(shared_datadir):
+    content = (shared_datadir / "loadbalancer_http_entry.csv").read_text().splitlines()
+    (record,) = AwsLogParser(
+        LogType.LoadBalancer, record_type="namedtuple", fields=["elb_status_code"]
+    ).parse(content)
+    assert record.elb_status_code == 200
+    assert record.elb is None
+
+
+def test_record_model_defaults():
+    record = record_model(LogType.CloudFront.model)
+    assert record._field_defaults == {"fle_encrypted_fields": ""}
+
+
+@pytest.mark.parametrize("fields", [None, ["status_code"]])
+def test_tuple_records_short_rows(shared_datadir, fields):
+    # The fle_encrypted_fields column is missing.
+    line = (shared_datadir / "cloudfront_entry2.csv").read_text().splitlines()[-1]
+    (entry,) = AwsLogParser(LogType.CloudFront, fields=fields).parse([line])
+    parser = AwsLogParser(LogType.CloudFront, record_type="tuple", fields=fields)
+    (record,) = parser.parse([line])
+    assert record == tuple(
+        getattr(entry, model_field.name) for model_field in dataclasses.fields(entry)
+    )
+    assert record[-1] == ""
+    with pytest.raises(TypeError):
+        list(parser.parse([line.rsplit("\t", 1)[0]]))
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"record_type": "dict"},
+        {"record_type": "tuple", "lazy": True},
+    ],
+)
+def test_records_invalid(options):
+    with pytest.raises(ValueError):
+        AwsLogParser(LogType.LoadBalancer, **options)
+
+
+@pytest.mark.parametrize(
+    "log_type,fixture_name",
+    [
+        (LogType.ClassicLoadBalancer, "classic_loadbalancer_http_entry.csv"),
+        (LogType.LoadBalancer, "loadbalancer_http_entry.csv"),
+        (LogType.LoadBalancer, "loadbalancer_http2_entry_auth_error.csv"),
+        (LogType.LoadBalancer, "loadbalancer_lambda_failed_entry.csv"),
+        (LogType.CloudFront, "cloudfront_entry2.csv"),
+        (LogType.CloudFront, "cloudfront_entry_cookie_with_encoding.csv"),
+        (LogType.CloudFront, "cloudfront-multiple.log"),
+    ],
+)
+@pytest.mark.parametrize("memoize", [False, True])
+def test_bytes_tokenizer(shared_datadir, log_type, fixture_name, memoize):
+    path = shared_datadir / fixture_name
+    expected = list(AwsLogParser(log_type).read_url(f"file://{path}"))
+    aws_log_parser = AwsLogParser(log_type, tokenizer="bytes", memoize=memoize)
+    assert list(aws_log_parser.read_url(f"file://{path}")) == expected
+    assert list(aws_log_parser.parse(path.read_text().splitlines())) == expected
+
+
+def test_bytes_tokenizer_fields_filters(shared_datadir):
+    content = [
+        (shared_datadir / name).read_text()
+        for name in ("loadbalancer_http_entry.csv", "loadbalancer_https_entry.csv")
+    ]
+    options = dict(
+        fields=["elb_status_code", "client"],
+        filters=[("target_processing_time", ">", 0.001)],
+    )
+    expected = list(AwsLogParser(LogType.LoadBalancer, **options).parse(content))
+    entries = list(
+        AwsLogParser(LogType.LoadBalancer, tokenizer="bytes", **options).parse(content)
+    )
+    assert entries == expected
+    assert len(entries) == 1
+
+
+@pytest.mark.parametrize(
+    "log_type,options",
+    [
+        (LogType.LoadBalancer, {"tokenizer": "regex"}),
+        (LogType.LoadBalancer, {"tokenizer": "bytes", "lazy": True}),
+        (LogType.CloudFront, {"tokenizer": "elb"}),
+    ],
+)
+def test_tokenizer_invalid(log_type, options):
+    with pytest.raises(ValueError):
+        AwsLogParser(log_type, **options)
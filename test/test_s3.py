@@ -0,0 +1,340 @@
+import dataclasses
+import datetime
+import pytest
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aws_log_parser import AwsLogParser, LogType
+from aws_log_parser.aws import AwsClient
+from aws_log_parser.aws.s3 import S3Service
+
+
+ELB_PREFIX = "AWSLogs/123456789012/elasticloadbalancing/us-east-1/"
+
+ELB_KEYS = [
+    f"{ELB_PREFIX}2024/{month:02}/{day:02}/{name}.log"
+    for month in (1, 2)
+    for day in (1, 2, 28)
+    for name in ("a", "b")
+]
+
+ELB_TIMED_KEYS = [
+    f"{ELB_PREFIX}2024/01/{day:02}/123456789012_elasticloadbalancing_us-east-1_"
+    f"app.my-lb.50dc6c495c0c9188_202401{day:02}T{time}Z_10.0.0.1_2l2qfqfe.log.gz"
+    for day in (1, 2, 3)
+    for time in ("0005", "1200", "2355")
+]
+
+CLOUDFRONT_KEYS = [
+    f"cf/E2ABC.2024-01-{day:02}-{hour:02}.{name}.gz"
+    for day in (1, 2)
+    for hour in (0, 23)
+    for name in ("a", "b")
+]
+
+
+def utc(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+@dataclass
+class MockListingPaginator:
+    keys: list
+    page_size: int
+    calls: list
+    last_modified: datetime.datetime
+    etags: dict
+    start_after: list
+
+    def paginate(self, Bucket, Prefix, Delimiter=None, StartAfter=None):
+        self.calls.append((Prefix, Delimiter))
+        if StartAfter:
+            self.start_after.append((Prefix, StartAfter))
+        # S3 can return a first page without Contents.
+        yield {"KeyCount": 0}
+        contents, prefixes = [], []
+        for key in sorted(self.keys):
+            if not key.startswith(Prefix) or (StartAfter and key <= StartAfter):
+                continue
+            index = key.find(Delimiter, len(Prefix)) if Delimiter else -1
+            if index == -1:
+                contents.append(
+                    {
+                        "Key": key,
+                        "LastModified": self.last_modified,
+                        "ETag": self.etags.get(key, '"1"'),
+                    }
+                )
+            elif key[: index + 1] not in prefixes:
+                prefixes.append(key[: index + 1])
+        for start in range(0, max(len(contents), len(prefixes)), self.page_size):
+            page = {}
+            if contents[start : start + self.page_size]:
+                page["Contents"] = contents[start : start + self.page_size]
+            if prefixes[start : start + self.page_size]:
+                page["CommonPrefixes"] = [
+                    {"Prefix": prefix}
+                    for prefix in prefixes[start : start + self.page_size]
+                ]
+            yield page
+
+
+@dataclass
+class MockListingS3Client:
+    keys: list
+    page_size: int = 2
+    calls: list = field(default_factory=list)
+    last_modified: datetime.datetime = field(
+        default_factory=lambda: datetime.datetime.now(datetime.timezone.utc)
+    )
+    etags: dict = field(default_factory=dict)
+    start_after: list = field(default_factory=list)
+
+    def get_paginator(self, *_):
+        return MockListingPaginator(
+            self.keys,
+            self.page_size,
+            self.calls,
+            self.last_modified,
+            self.etags,
+            self.start_after,
+        )
+
+
+@pytest.fixture
+def s3_service():
+    return S3Service(aws_client=AwsClient())
+
+
+def mock_client(monkeypatch, keys):
+    client = MockListingS3Client(keys)
+    monkeypatch.setattr(S3Service, "client", client)
+    return client
+
+
+def test_list_files_empty_pages(monkeypatch, s3_service):
+    mock_client(monkeypatch, ELB_KEYS)
+    assert len(s3_service.list_files("bucket", ELB_PREFIX, "LastModified")) == 12
+    assert s3_service.list_files("bucket", "missing/", "LastModified") == []
+
+
+@pytest.mark.parametrize(
+    "prefix,expected",
+    [
+        ("AWSLogs/123456789012/elasticloadbalancing/", ELB_KEYS),
+        (ELB_PREFIX, ELB_KEYS),
+        (f"{ELB_PREFIX}2024/0", ELB_KEYS),
+        (f"{ELB_PREFIX}2024/02/", ELB_KEYS[6:]),
+        (f"{ELB_PREFIX}2024/02/28/b", ELB_KEYS[-1:]),
+    ],
+)
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_list_partitioned_elb(monkeypatch, s3_service, prefix, expected, concurrency):
+    client = mock_client(monkeypatch, ELB_KEYS)
+    keys = s3_service.list_keys(
+        "bucket",
+        prefix,
+        layout=LogType.LoadBalancer.key_layout,
+        concurrency=concurrency,
+    )
+    assert list(keys) == expected
+    # Each daily partition is listed on its own.
+    partitions = {key.rsplit("/", 1)[0] + "/" for key in expected}
+    assert len([call for call in client.calls if call[1] is None]) == len(partitions)
+
+
+@pytest.mark.parametrize("prefix", ["cf/", "cf/E2ABC.2024-01-0"])
+def test_list_partitioned_cloudfront(monkeypatch, s3_service, prefix):
+    client = mock_client(monkeypatch, CLOUDFRONT_KEYS)
+    keys = s3_service.list_keys(
+        "bucket", prefix, layout=LogType.CloudFront.key_layout, concurrency=2
+    )
+    assert list(keys) == CLOUDFRONT_KEYS
+    assert ("cf/E2ABC.2024-01-02-", None) in client.calls
+
+
+def test_list_partitioned_streams(monkeypatch, s3_service):
+    client = mock_client(monkeypatch, ELB_KEYS)
+    keys = s3_service.list_keys(
+        "bucket", ELB_PREFIX, layout=LogType.LoadBalancer.key_layout
+    )
+    assert next(keys) == ELB_KEYS[0]
+    # Only the first partition has been listed.
+    assert [call for call in client.calls if call[1] is None] == [
+        (f"{ELB_PREFIX}2024/01/01/", None)
+    ]
+
+
+def test_list_partitioned_without_partitions(monkeypatch, s3_service):
+    mock_client(monkeypatch, ["logs/a.log", "logs/b.log"])
+    keys = s3_service.list_keys(
+        "bucket", "logs/", layout=LogType.LoadBalancer.key_layout
+    )
+    assert list(keys) == ["logs/a.log", "logs/b.log"]
+
+
+def test_parser_partitioned_listing(monkeypatch):
+    mock_client(monkeypatch, ELB_KEYS)
+    parser = AwsLogParser(LogType.LoadBalancer, partitioned_listing=True)
+    keys = []
+    monkeypatch.setattr(
+        S3Service, "read_key", lambda self, bucket, key, **_: keys.append(key) or []
+    )
+    assert list(parser.read_url(f"s3://bucket/{ELB_PREFIX}")) == []
+    assert keys == ELB_KEYS
+
+
+def test_parser_partitioned_listing_without_layout():
+    log_type = dataclasses.replace(LogType.LoadBalancer, key_layout=None)
+    with pytest.raises(ValueError):
+        AwsLogParser(log_type, partitioned_listing=True)
+
+
+@pytest.mark.parametrize(
+    "since,until,expected",
+    [
+        (utc(2024, 1, 2, 11), utc(2024, 1, 2, 12, 30), [4]),
+        # Keys hold the logs of the five minutes before their time.
+        (utc(2024, 1, 2, 12, 3), None, [4, 5, 6, 7, 8]),
+        (None, utc(2024, 1, 1, 23, 10), [0, 1, 2, 3]),
+        (utc(2024, 1, 4, 0, 10), None, []),
+    ],
+)
+def test_list_keys_window(monkeypatch, s3_service, since, until, expected):
+    client = mock_client(monkeypatch, ELB_TIMED_KEYS)
+    keys = s3_service.list_keys(
+        "bucket",
+        ELB_PREFIX,
+        layout=LogType.LoadBalancer.key_layout,
+        since=since,
+        until=until,
+    )
+    assert list(keys) == [ELB_TIMED_KEYS[index] for index in expected]
+    # The days out of the window aren't listed.
+    days = {ELB_TIMED_KEYS[index].rsplit("/", 1)[0] + "/" for index in expected}
+    listed = {prefix for prefix, delimiter in client.calls if delimiter is None}
+    assert days <= listed
+    assert len(listed) <= len(days) + 1
+
+
+def test_list_keys_window_partitions(monkeypatch, s3_service):
+    client = mock_client(monkeypatch, ELB_KEYS)
+    keys = s3_service.list_keys(
+        "bucket",
+        ELB_PREFIX,
+        layout=LogType.LoadBalancer.key_layout,
+        since=utc(2024, 2, 2),
+        until=utc(2024, 2, 3),
+    )
+    # The previous day may hold the first logs of the window.
+    assert list(keys) == ELB_KEYS[6:10]
+    assert [call for call in client.calls if call[1] is None] == [
+        (f"{ELB_PREFIX}2024/02/01/", None),
+        (f"{ELB_PREFIX}2024/02/02/", None),
+    ]
+    # January isn't walked down to its days.
+    assert (f"{ELB_PREFIX}2024/01/", "/") not in client.calls
+
+
+def test_list_keys_since_last_modified(monkeypatch, s3_service):
+    client = mock_client(monkeypatch, ["logs/a.log", "logs/b.log"])
+    client.last_modified = utc(2024, 1, 1)
+    assert list(s3_service.list_keys("bucket", "logs/", since=utc(2024, 1, 2))) == []
+    assert (
+        len(list(s3_service.list_keys("bucket", "logs/", since=utc(2023, 12, 31)))) == 2
+    )
+
+
+def test_parser_window_listing(monkeypatch):
+    mock_client(monkeypatch, ELB_TIMED_KEYS)
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        file_suffix=".log.gz",
+        since=datetime.datetime(2024, 1, 3),
+    )
+    keys = []
+    monkeypatch.setattr(
+        S3Service, "read_key", lambda self, bucket, key, **_: keys.append(key) or []
+    )
+    assert list(parser.read_url(f"s3://bucket/{ELB_PREFIX}")) == []
+    assert keys == ELB_TIMED_KEYS[5:]
+
+
+def test_parser_incremental(monkeypatch, tmp_path):
+    client = mock_client(monkeypatch, list(ELB_TIMED_KEYS))
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        file_suffix=".log.gz",
+        checkpoint_path=tmp_path / "checkpoints.db",
+    )
+    keys = []
+    monkeypatch.setattr(
+        S3Service, "read_key", lambda self, bucket, key, **_: keys.append(key) or []
+    )
+    url = f"s3://bucket/{ELB_PREFIX}"
+    assert list(parser.read_url(url, incremental=True)) == []
+    assert keys == ELB_TIMED_KEYS
+    assert client.start_after == []
+
+    keys.clear()
+    client.calls.clear()
+    new_key = ELB_TIMED_KEYS[-1].replace("T2355Z", "T2359Z")
+    client.keys.append(new_key)
+    client.etags[ELB_TIMED_KEYS[3]] = '"2"'
+    assert list(parser.read_url(url, incremental=True)) == []
+    assert keys == [ELB_TIMED_KEYS[3], new_key]
+    # Listing resumes from the last two partitions processed.
+    assert client.start_after == [
+        (prefix, f"{ELB_PREFIX}2024/01/02/")
+        for prefix in (ELB_PREFIX, f"{ELB_PREFIX}2024/", f"{ELB_PREFIX}2024/01/")
+    ]
+    assert (f"{ELB_PREFIX}2024/01/01/", None) not in client.calls
+
+    keys.clear()
+    assert list(parser.read_url(url)) == []
+    assert len(keys) == 10
+
+
+def test_parser_incremental_after_window(monkeypatch, tmp_path):
+    client = mock_client(monkeypatch, list(ELB_TIMED_KEYS))
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        file_suffix=".log.gz",
+        checkpoint_path=tmp_path / "checkpoints.db",
+    )
+    keys = []
+    monkeypatch.setattr(
+        S3Service, "read_key", lambda self, bucket, key, **_: keys.append(key) or []
+    )
+    url = f"s3://bucket/{ELB_PREFIX}"
+    assert list(parser.read_url(url, incremental=True, since=utc(2024, 1, 2, 12))) == []
+    assert keys == ELB_TIMED_KEYS[4:]
+
+    keys.clear()
+    # The objects before the window were never processed.
+    assert list(parser.read_url(url, incremental=True)) == []
+    assert keys == ELB_TIMED_KEYS[:4]
+    assert client.start_after == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parser_incremental_entries(monkeypatch, tmp_path, workers):
+    line = (Path(__file__).parent / "data" / "loadbalancer_http_entry.csv").read_text()
+    mock_client(monkeypatch, ELB_TIMED_KEYS[:2])
+    monkeypatch.setattr(
+        S3Service, "read_key", lambda self, bucket, key, **_: iter([line])
+    )
+    parser = AwsLogParser(
+        LogType.LoadBalancer,
+        file_suffix=".log.gz",
+        checkpoint_path=tmp_path / "checkpoints.db",
+        incremental=True,
+        workers=workers,
+    )
+    entries = parser.read_url(f"s3://bucket/{ELB_PREFIX}")
+    next(entries)
+    entries.close()
+    # Only the objects whose entries were all yielded are checkpointed.
+    assert len(list(parser.read_url(f"s3://bucket/{ELB_PREFIX}"))) == 2
+    assert list(parser.read_url(f"s3://bucket/{ELB_PREFIX}")) == []
@@ -0,0 +1,75 @@
+import csv
+import dataclasses
+import typing
+
+import pytest
+
+from aws_log_parser.tokenizers import (
+    elb_pattern,
+    split_bytes,
+    tokenize_bytes,
+    tokenize_elb,
+)
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "a b c",
+        'a "b c" d "e" f',
+        '"a b" c',
+        'c "a b"',
+        '"x" "y"',
+        '"x"  "y"',
+        ' "a" ',
+        '"" x',
+        '"a""b" c',
+        "x  y",
+        '"-" -',
+        "-",
+        'a"b c',
+        '"a" b"c d',
+    ],
+)
+def test_split_bytes(line):
+    assert [value.decode() for value in split_bytes(line.encode(), b" ")] == next(
+        csv.reader([line], delimiter=" ")
+    )
+
+
+def test_tokenize_bytes():
+    lines = [b"#Version: 1.0", b"", 'a\t"b"\té'.encode(), "c\td"]
+    assert list(tokenize_bytes(lines, "\t")) == [
+        [b"a", b"b", "é".encode()],
+        [b"c", b"d"],
+    ]
+
+
+@dataclasses.dataclass
+class Entry:
+    method: str
+    request: str
+    size: int
+    instance_id: typing.Optional[str] = None
+
+
+ENTRY_PATTERN = elb_pattern(Entry, ("request",))
+
+
+@pytest.mark.parametrize(
+    "line,expected",
+    [
+        ('GET "/a b" 1', ("GET", "/a b", "1")),
+        ('GET "-" 1 "appended" field', ("GET", "-", "1")),
+        # Escaped quotes and missing fields are left to csv.reader.
+        ('GET "/a ""b""" 1', ["GET", '/a "b"', "1"]),
+        ('GET "/a"', ["GET", "/a"]),
+    ],
+)
+def test_tokenize_elb(line, expected):
+    assert list(tokenize_elb(["#Version: 1.0", "", line], ENTRY_PATTERN)) == [expected]
+
+
+def test_tokenize_elb_limit():
+    pattern = elb_pattern(Entry, ("request",), 1)
+    assert list(tokenize_elb(['GET "/a b" 1'], pattern, 4)) == [("GET", "-", "-", "-")]
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from aws_log_parser.util import batcher, prefetch
+
+
+def test_batcher():
+    assert list(batcher(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_prefetch_ordered():
+    delays = [0.03, 0.0, 0.02, 0.0, 0.01]
+
+    def func(i):
+        time.sleep(delays[i])
+        return i
+
+    assert list(prefetch(func, range(len(delays)), 5)) == [0, 1, 2, 3, 4]
+
+
+def test_prefetch_completion_order():
+    release = threading.Event()
+
+    def func(i):
+        if i == 0:
+            release.wait(1)
+        return i
+
+    results = []
+    for result in prefetch(func, range(3), 3, ordered=False):
+        results.append(result)
+        if len(results) == 2:
+            release.set()
+    assert results[-1] == 0
+    assert sorted(results) == [0, 1, 2]
+
+
+def test_prefetch_bounded():
+    submitted = []
+
+    def func(i):
+        submitted.append(i)
+        return i
+
+    results = prefetch(func, range(100), 2, queue_size=3)
+    assert next(results) == 0
+    time.sleep(0.01)
+    assert len(submitted) <= 4
+    results.close()
+
+
+def test_prefetch_error():
+    def func(i):
+        if i == 1:
+            raise ValueError(i)
+        return i
+
+    with pytest.raises(ValueError):
+        list(prefetch(func, range(3), 2))